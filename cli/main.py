@@ -7,7 +7,8 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
-if SRC.exists():
+# Only prepend once; a duplicate entry makes every missed import scan src/ twice.
+if SRC.exists() and str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
 from bills_analysis.cli import main
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import os
 import re
 import argparse
+import functools
+import itertools
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -9,45 +12,125 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_NOTES = ROOT / "SESSION_NOTES.md"
+_LINE_RE = re.compile(r"[^\n]+")
 
 
-def _run_git(args: list[str]) -> str:
-    result = subprocess.run(
+def _spawn_git(args: list[str]) -> subprocess.Popen[bytes]:
+    """Start a git command without waiting for it."""
+
+    return subprocess.Popen(
         ["git", *args],
         cwd=ROOT,
-        capture_output=True,
-        text=True,
-        check=False,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
-    if result.returncode != 0:
+
+
+def _collect_git(proc: subprocess.Popen[bytes]) -> str:
+    """Wait for a spawned git command and return its stripped stdout ('' on failure)."""
+
+    stdout, _ = proc.communicate()
+    if proc.returncode != 0:
         return ""
-    return result.stdout.strip()
+    # git emits UTF-8; decode the raw bytes once instead of going through a locale text wrapper.
+    return stdout.decode("utf-8", errors="replace").strip()
+
+
+@functools.lru_cache(maxsize=32)
+def _run_git(args: tuple[str, ...]) -> str:
+    """Run a git command once per process; repeated queries reuse the first result."""
+
+    return _collect_git(_spawn_git(list(args)))
+
+
+@functools.lru_cache(maxsize=1)
+def _git_context_proc() -> subprocess.Popen[bytes]:
+    """Spawn the HEAD metadata query once; callers may start it early to overlap other I/O."""
+
+    return _spawn_git(["log", "-1", "--format=%h%x00%D%x00%s"])
+
+
+@functools.lru_cache(maxsize=1)
+def _git_context() -> dict[str, str]:
+    """Read branch, short head and subject of HEAD with one git call."""
+
+    out = _collect_git(_git_context_proc())
+    head, refs, subject = (out.split("\x00", 2) + ["", "", ""])[:3]
+    branch = "HEAD" if head else ""
+    for ref in refs.split(", "):
+        if ref.startswith("HEAD -> "):
+            branch = ref[len("HEAD -> ") :]
+            break
+    return {
+        "branch": branch or "UNKNOWN",
+        "head": head or "UNKNOWN",
+        "subject": subject or "NO_COMMIT_MESSAGE",
+    }
 
 
 def _now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def _upsert_end_block(path: Path, session: str, block: str) -> None:
+_SECTION_SEP = "\n## ["
+
+
+def _find_end_block(text: str, session: str) -> tuple[int, int] | None:
+    """Locate the last END block for a session as a (start, end) slice, scanning sections from the end."""
+
+    # A block runs from its '\n## [' separator up to the next separator (or EOF) and must end with a newline.
+    header_tail = f" END {session}"
+    end = len(text)
+    while (start := text.rfind(_SECTION_SEP, 0, end)) != -1:
+        body = start + len(_SECTION_SEP)
+        line_end = text.find("\n", body, end)
+        if line_end != -1 and text[end - 1] == "\n":
+            stamp, sep, rest = text[body:line_end].partition("]")
+            if stamp and sep and rest == header_tail:
+                return start, end
+        end = start
+    return None
+
+
+def _upsert_end_block(path: Path, session: str, block: str, text: str | None = None) -> None:
     """Replace the last END block for the given session; append if none exists."""
-    text = path.read_text(encoding="utf-8") if path.exists() else ""
-    # Match an END header for this session and all following lines until the next '## [' header or EOF.
-    pattern = re.compile(
-        rf"\n## \[[^\]]+\] END {re.escape(session)}\n(?:.*\n)*?(?=(\n## \[)|\Z)",
-        re.MULTILINE,
-    )
-    matches = list(pattern.finditer(text))
-    if not matches:
-        path.write_text(text + block, encoding="utf-8")
+    if text is None:
+        text = path.read_text(encoding="utf-8") if path.exists() else ""
+    # Cheap substring probe first; the section walk only runs when an END header may exist.
+    span = _find_end_block(text, session) if f"] END {session}\n" in text else None
+    if span is None:
+        # Nothing to replace: append the block instead of rewriting the whole file.
+        with path.open("a", encoding="utf-8") as f:
+            f.write(block)
         return
 
-    last = matches[-1]
-    new_text = text[: last.start()] + block + text[last.end() :]
-    path.write_text(new_text, encoding="utf-8")
+    start, end = span
+    # Write the three slices straight through one buffered handle instead of concatenating,
+    # into a sibling temp file that atomically replaces the notes so readers never see a partial file.
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8", buffering=1 << 16) as f:
+        f.write(text[:start])
+        f.write(block)
+        f.write(text[end:])
+    os.replace(tmp_path, path)
+
+
+def _has_content(path: Path) -> bool:
+    """Check for any non-whitespace byte without reading the whole notes file."""
+
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with path.open("rb") as f:
+        while chunk := f.read(4096):
+            if chunk.strip():
+                return True
+    return False
 
 
 def _ensure_header(path: Path) -> None:
-    if path.exists() and path.read_text(encoding="utf-8").strip():
+    """Write the notes header when the file is missing or blank."""
+
+    if _has_content(path):
         return
     path.write_text(
         "# SESSION_NOTES\n\n"
@@ -57,9 +140,12 @@ def _ensure_header(path: Path) -> None:
 
 
 def cmd_start(path: Path, session: str) -> None:
+    """Append a START block recording the current branch, head and worktree."""
+
     _ensure_header(path)
-    branch = _run_git(["rev-parse", "--abbrev-ref", "HEAD"]) or "UNKNOWN"
-    commit = _run_git(["rev-parse", "--short", "HEAD"]) or "UNKNOWN"
+    git = _git_context()
+    branch = git["branch"]
+    commit = git["head"]
     worktree = str(ROOT)
     block = (
         f"\n## [{_now()}] START {session}\n"
@@ -74,47 +160,83 @@ def cmd_start(path: Path, session: str) -> None:
     print(f"[session-notes] start recorded in {path}")
 
 
+_START_HEAD_PREFIX = "- start_head: `"
+
+
+def _start_head_in_block(notes_text: str, cursor: int) -> str | None:
+    """Return the first start_head value in the block body starting at cursor, if any."""
+
+    # The body runs line by line until the next '## [' header or EOF.
+    size = len(notes_text)
+    while cursor < size and not notes_text.startswith("## [", cursor):
+        if notes_text.startswith(_START_HEAD_PREFIX, cursor):
+            value_start = cursor + len(_START_HEAD_PREFIX)
+            close = notes_text.find("`", value_start)
+            if close == -1:
+                return None
+            if close > value_start:
+                return notes_text[value_start:close]
+        line_end = notes_text.find("\n", cursor)
+        if line_end == -1:
+            return None
+        cursor = line_end + 1
+    return None
+
+
 def _find_last_start_head(notes_text: str, session: str) -> str:
     """Find the last recorded start_head for this session in SESSION_NOTES.md."""
-    import re
 
-    pattern = re.compile(rf"## \[[^\]]+\] START {re.escape(session)}\n(?:.*\n)*?- start_head: `([^`]+)`", re.MULTILINE)
-    matches = list(pattern.finditer(notes_text))
-    if not matches:
-        return ""
-    return matches[-1].group(1).strip()
+    # Walk START headers from the end with plain string scans so only the tail of a long file is read.
+    marker = f"] START {session}\n"
+    end = len(notes_text)
+    while (pos := notes_text.rfind(marker, 0, end)) != -1:
+        end = pos
+        line_start = notes_text.rfind("\n", 0, pos) + 1
+        stamp = notes_text[line_start + 4 : pos]
+        if not notes_text.startswith("## [", line_start) or not stamp or "]" in stamp:
+            continue
+        head = _start_head_in_block(notes_text, pos + len(marker))
+        if head is not None:
+            return head.strip()
+    return ""
 
 
 def cmd_end(path: Path, session: str, next_step: str, risk: str) -> None:
+    """Write or replace the session's END block with HEAD, its changed files and the next step."""
+
+    _git_context_proc()  # let git run while the notes file is checked and read
     _ensure_header(path)
-    branch = _run_git(["rev-parse", "--abbrev-ref", "HEAD"]) or "UNKNOWN"
-    commit = _run_git(["rev-parse", "--short", "HEAD"]) or "UNKNOWN"
-    subject = _run_git(["log", "-1", "--pretty=%s"]) or "NO_COMMIT_MESSAGE"
-    notes_text = path.read_text(encoding="utf-8") if path.exists() else ""
+    notes_text = path.read_text(encoding="utf-8")
+    git = _git_context()
+    branch = git["branch"]
+    commit = git["head"]
+    subject = git["subject"]
     start_head = _find_last_start_head(notes_text, session)
-    current_head = _run_git(["rev-parse", "--short", "HEAD"]) or "UNKNOWN"
+    current_head = commit
 
     has_new_commit = bool(start_head) and (start_head != "UNKNOWN") and (current_head != "UNKNOWN") and (start_head != current_head)
 
-    def _fmt_files(lines: list[str]) -> str:
-        if not lines:
+    def _fmt_files(files: str) -> str:
+        """Format git's file list as inline code, capped at 12 names."""
+
+        # Lazily walk git's newline-separated output; only the first 12 names are kept.
+        names = filter(None, (m.group().strip() for m in _LINE_RE.finditer(files)))
+        shown = list(itertools.islice(names, 12))
+        if not shown:
             return "`(no files)`"
-        out = ", ".join(f"`{p}`" for p in lines[:12])
-        if len(lines) > 12:
-            out += f", ... (+{len(lines)-12} files)"
+        out = ", ".join(f"`{p}`" for p in shown)
+        extra = sum(1 for _ in names)
+        if extra:
+            out += f", ... (+{extra} files)"
         return out
 
     changed_files = ""
     uncommitted_files = ""
 
     if has_new_commit:
-        files = _run_git(["show", "--name-only", "--pretty=format:", "HEAD"])
-        file_lines = [line.strip() for line in files.splitlines() if line.strip()]
-        changed_files = _fmt_files(file_lines)
+        changed_files = _fmt_files(_run_git(("show", "--name-only", "--pretty=format:", "HEAD")))
     else:
-        files = _run_git(["diff", "--name-only"])
-        file_lines = [line.strip() for line in files.splitlines() if line.strip()]
-        uncommitted_files = _fmt_files(file_lines)
+        uncommitted_files = _fmt_files(_run_git(("diff", "--name-only")))
 
 
     block = (
@@ -128,7 +250,7 @@ def cmd_end(path: Path, session: str, next_step: str, risk: str) -> None:
         + f"- status: done\n"
     )
 
-    _upsert_end_block(path, session, block)
+    _upsert_end_block(path, session, block, notes_text)
     print(f"[session-notes] end recorded (upsert) in {path}")
 
 
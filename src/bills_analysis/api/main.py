@@ -1,20 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import os
+import shutil
+import stat
 from collections.abc import AsyncIterator
 from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, BinaryIO
 from uuid import uuid4
 
-from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import ValidationError
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+import orjson
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from bills_analysis.integrations.container import AppContainer, build_container
 from bills_analysis.models.api_requests import (
     CreateBatchRequest,
     CreateBatchUploadForm,
@@ -23,7 +27,6 @@ from bills_analysis.models.api_requests import (
 )
 from bills_analysis.models.api_responses import (
     BatchListResponse,
-    BatchReviewRow,
     BatchReviewRowsResponse,
     BatchResponse,
     CreateBatchUploadTaskResponse,
@@ -32,8 +35,30 @@ from bills_analysis.models.api_responses import (
 )
 from bills_analysis.models.common import InputFile
 from bills_analysis.models.enums import BatchType
+from bills_analysis.models.version import SCHEMA_VERSION
 
-container: AppContainer = build_container()
+if TYPE_CHECKING:
+    from bills_analysis.integrations.container import AppContainer
+    from bills_analysis.models.internal import BatchRecord
+
+
+_UPLOAD_CHUNK_SIZE = 1 << 20
+_UPLOAD_SAVE_CONCURRENCY = 8
+_BATCH_LIST_CHUNK = 64
+_BATCH_ITEMS_ADAPTER = TypeAdapter(list[BatchResponse])
+# Previews belong to one batch and may change after re-review, so allow only short private caching.
+_PREVIEW_CACHE_CONTROL = "private, max-age=300"
+_EXCL_CREATE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+_EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+
+@lru_cache(maxsize=1)
+def _container() -> AppContainer:
+    """Build the runtime container on first use so importing the app stays light."""
+
+    from bills_analysis.integrations.container import build_container
+
+    return build_container()
 
 
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
@@ -41,7 +66,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     run_inline_worker = os.getenv("RUN_INLINE_WORKER", "true").lower() == "true"
     if run_inline_worker:
-        app.state.worker_task = asyncio.create_task(container.worker.run_forever())
+        app.state.worker_task = asyncio.create_task(_container().worker.run_forever())
     try:
         yield
     finally:
@@ -53,7 +78,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             await task
 
 
-app = FastAPI(title="bills_analysis webapp skeleton", version="0.1.0", lifespan=lifespan)
+app = FastAPI(
+    title="bills_analysis webapp skeleton",
+    version="0.1.0",
+    lifespan=lifespan,
+    # orjson is the single JSON codec: NaN/inf always serialize as null.
+    default_response_class=ORJSONResponse,
+)
 
 
 def _load_cors_allow_origins() -> list[str]:
@@ -82,8 +113,8 @@ def _parse_metadata_json(raw_metadata: str | None) -> dict[str, Any]:
     if raw_metadata is None or raw_metadata.strip() == "":
         return {}
     try:
-        parsed = json.loads(raw_metadata)
-    except json.JSONDecodeError as exc:
+        parsed = orjson.loads(raw_metadata)
+    except orjson.JSONDecodeError as exc:
         raise HTTPException(status_code=400, detail="metadata_json must be valid JSON") from exc
     if not isinstance(parsed, dict):
         raise HTTPException(status_code=400, detail="metadata_json must be a JSON object")
@@ -94,7 +125,8 @@ def _validate_pdf_upload(file: UploadFile, *, field_name: str) -> None:
     """Validate filename extension and content type for uploaded PDF."""
 
     filename = (file.filename or "").strip()
-    if not filename or not filename.lower().endswith(".pdf"):
+    # Lower-case only the fixed-length tail instead of the whole filename.
+    if not filename or filename[-4:].lower() != ".pdf":
         raise HTTPException(status_code=400, detail=f"{field_name} must be PDF files")
     if file.content_type and "pdf" not in file.content_type.lower():
         raise HTTPException(status_code=400, detail=f"{field_name} must be PDF files")
@@ -103,8 +135,8 @@ def _validate_pdf_upload(file: UploadFile, *, field_name: str) -> None:
 def _validate_excel_upload(file: UploadFile, *, field_name: str) -> None:
     """Validate filename extension and content type for uploaded Excel files."""
 
-    filename = (file.filename or "").strip().lower()
-    if not filename or not (filename.endswith(".xlsx") or filename.endswith(".xlsm")):
+    filename = (file.filename or "").strip()
+    if not filename or filename[-5:].lower() not in _EXCEL_SUFFIXES:
         raise HTTPException(status_code=400, detail=f"{field_name} must be .xlsx or .xlsm file")
     if file.content_type:
         content_type = file.content_type.lower()
@@ -123,34 +155,85 @@ async def _save_upload_file(
     """Persist one UploadFile to disk and return the saved file path."""
 
     dest_dir.mkdir(parents=True, exist_ok=True)
-    safe_name = Path(file.filename or "").name or f"{prefix}_{index:02d}.pdf"
-    stem = Path(safe_name).stem or f"{prefix}_{index:02d}"
+    # Split the client filename with plain string ops; only the final destination becomes a Path.
+    base_name = os.path.basename(file.filename or "")
+    safe_name = base_name if base_name not in ("", ".") else f"{prefix}_{index:02d}.pdf"
+    dot = safe_name.rfind(".")
+    has_ext = 0 < dot < len(safe_name) - 1
+    stem = (safe_name[:dot] if has_ext else safe_name) or f"{prefix}_{index:02d}"
     suffix = forced_suffix
     if suffix is None:
-        suffix = Path(safe_name).suffix or ""
-    dest_path = dest_dir / f"{index:02d}_{stem}{suffix}"
-    attempt = 1
-    while dest_path.exists():
-        dest_path = dest_dir / f"{index:02d}_{stem}_{attempt}{suffix}"
-        attempt += 1
-    content = await file.read()
-    dest_path.write_bytes(content)
+        suffix = safe_name[dot:] if has_ext else ""
+    # Claim the first free name atomically with O_EXCL instead of probing with exists().
+    for attempt in itertools.count():
+        name_suffix = f"_{attempt}" if attempt else ""
+        dest_path = dest_dir / f"{index:02d}_{stem}{name_suffix}{suffix}"
+        try:
+            fd = os.open(dest_path, _EXCL_CREATE_FLAGS, 0o644)
+        except FileExistsError:
+            continue
+        break
+    # Stream the spooled upload in 1 MiB chunks off the event loop instead of buffering it whole.
+    await asyncio.to_thread(_copy_upload, file.file, fd)
     await file.close()
     return dest_path
 
 
-def _safe_preview_path(batch_id: str, preview_path: str) -> Path:
+async def _save_upload_files(
+    files: list[UploadFile],
+    *,
+    dest_dir: Path,
+    prefix: str,
+) -> list[Path]:
+    """Persist uploads concurrently (bounded) and return saved paths in input order."""
+
+    semaphore = asyncio.Semaphore(_UPLOAD_SAVE_CONCURRENCY)
+
+    async def _save(index: int, file: UploadFile) -> Path:
+        async with semaphore:
+            return await _save_upload_file(file, dest_dir=dest_dir, prefix=prefix, index=index)
+
+    return list(await asyncio.gather(*(_save(index, file) for index, file in enumerate(files, start=1))))
+
+
+def _copy_upload(source: BinaryIO, fd: int) -> None:
+    """Copy an upload stream to an already-created file descriptor in fixed-size chunks."""
+
+    with os.fdopen(fd, "wb", buffering=_UPLOAD_CHUNK_SIZE) as out:
+        shutil.copyfileobj(source, out, _UPLOAD_CHUNK_SIZE)
+
+
+@lru_cache(maxsize=256)
+def _allowed_preview_root(batch_id: str) -> Path:
+    """Resolve the batch sandbox root once per batch id."""
+
+    return (Path("outputs") / "webapp" / batch_id).resolve()
+
+
+def _safe_preview_path(batch_id: str, preview_path: str) -> tuple[Path, os.stat_result]:
     """Resolve and validate preview path stays within the batch sandbox root."""
 
     resolved = Path(preview_path).resolve()
-    allowed_root = (Path("outputs") / "webapp" / batch_id).resolve()
-    if not resolved.exists() or not resolved.is_file():
-        raise HTTPException(status_code=404, detail="preview file not found")
+    allowed_root = _allowed_preview_root(batch_id)
     if resolved.suffix.lower() != ".pdf":
         raise HTTPException(status_code=404, detail="preview file not found")
     if not resolved.is_relative_to(allowed_root):
         raise HTTPException(status_code=404, detail="preview file not found")
-    return resolved
+    # One stat serves both the is-file check and FileResponse, which would otherwise stat again.
+    try:
+        stat_result = resolved.stat()
+    except OSError as exc:
+        raise HTTPException(status_code=404, detail="preview file not found") from exc
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="preview file not found")
+    return resolved, stat_result
+
+
+def _model_response(model: BaseModel) -> Response:
+    """Encode a response model once with pydantic's serializer, skipping FastAPI's re-validation pass."""
+
+    # Routes keep response_model= for the OpenAPI contract; returning a Response bypasses serialize_response.
+    return Response(content=model.model_dump_json(), media_type="application/json")
 
 
 @app.get("/healthz")
@@ -161,11 +244,11 @@ async def healthz() -> dict[str, str]:
 
 
 @app.post("/v1/batches", response_model=BatchResponse)
-async def create_batch(req: CreateBatchRequest) -> BatchResponse:
+async def create_batch(req: CreateBatchRequest) -> Response:
     """Create a batch and enqueue process task."""
 
-    record = await container.service.create_batch(req)
-    return BatchResponse.from_record(record)
+    record = await _container().service.create_batch(req)
+    return _model_response(BatchResponse.from_record(record))
 
 
 @app.post(
@@ -180,7 +263,7 @@ async def create_batch_upload(
     zbon_file: UploadFile | None = File(None),
     bar_files: list[UploadFile] = File(default_factory=list),
     office_files: list[UploadFile] = File(default_factory=list),
-) -> CreateBatchUploadTaskResponse:
+) -> Response:
     """Create a batch from multipart upload and enqueue processing task."""
 
     metadata = _parse_metadata_json(metadata_json)
@@ -192,6 +275,9 @@ async def create_batch_upload(
 
     upload_root = Path("outputs") / "webapp" / "uploads" / str(uuid4())
     inputs: list[InputFile] = []
+    # FastAPI already parsed this Request's form to bind the parameters above and Starlette caches it,
+    # so this is a lookup, not a second multipart parse. It also sees empty/duplicate zbon_file parts
+    # that the single-file parameter hides; the parameter stays single-file to keep the v1 contract.
     form_data = await request.form()
     zbon_part_count = len(form_data.getlist("zbon_file"))
 
@@ -220,15 +306,10 @@ async def create_batch_upload(
         )
         inputs.append(InputFile(path=str(zbon_path), category="zbon"))
 
-        for index, file in enumerate(bar_files, start=1):
+        for file in bar_files:
             _validate_pdf_upload(file, field_name="bar_files")
-            bar_path = await _save_upload_file(
-                file,
-                dest_dir=upload_root / "bar",
-                prefix="bar",
-                index=index,
-            )
-            inputs.append(InputFile(path=str(bar_path), category="bar"))
+        bar_paths = await _save_upload_files(bar_files, dest_dir=upload_root / "bar", prefix="bar")
+        inputs.extend(InputFile(path=str(bar_path), category="bar") for bar_path in bar_paths)
     else:
         if not office_files:
             raise HTTPException(
@@ -240,15 +321,14 @@ async def create_batch_upload(
                 status_code=400,
                 detail="zbon_file/bar_files are not allowed when type=office",
             )
-        for index, file in enumerate(office_files, start=1):
+        for file in office_files:
             _validate_pdf_upload(file, field_name="office_files")
-            office_path = await _save_upload_file(
-                file,
-                dest_dir=upload_root / "office",
-                prefix="office",
-                index=index,
-            )
-            inputs.append(InputFile(path=str(office_path), category="office"))
+        office_paths = await _save_upload_files(
+            office_files,
+            dest_dir=upload_root / "office",
+            prefix="office",
+        )
+        inputs.extend(InputFile(path=str(office_path), category="office") for office_path in office_paths)
 
     create_req = CreateBatchRequest(
         type=upload_form.type,
@@ -256,56 +336,83 @@ async def create_batch_upload(
         inputs=inputs,
         metadata=upload_form.metadata,
     )
-    batch, task = await container.service.create_batch_with_task(create_req)
-    return CreateBatchUploadTaskResponse.from_batch_and_task(batch=batch, task=task)
+    batch, task = await _container().service.create_batch_with_task(create_req)
+    return _model_response(CreateBatchUploadTaskResponse.from_batch_and_task(batch=batch, task=task))
 
 
 @app.get("/v1/batches", response_model=BatchListResponse)
-async def list_batches(limit: int = 100) -> BatchListResponse:
+async def list_batches(limit: int = 100) -> Response:
     """List batches with stable v1 response envelope."""
 
-    records = await container.service.list_batches(limit=limit)
-    items = [BatchResponse.from_record(r) for r in records]
-    return BatchListResponse(total=len(items), items=items)
+    records = await _container().service.list_batches(limit=limit)
+    return StreamingResponse(_iter_batch_list_json(records), media_type="application/json")
+
+
+async def _iter_batch_list_json(records: list[BatchRecord]) -> AsyncIterator[bytes]:
+    """Stream the BatchListResponse envelope one encoded item at a time."""
+
+    # Same bytes as BatchListResponse(...).model_dump_json(), without building the items list first.
+    # Each slice is encoded by one list adapter call; its outer brackets are dropped when joining.
+    yield b'{"schema_version":"%s","total":%d,"items":[' % (SCHEMA_VERSION.encode(), len(records))
+    for start in range(0, len(records), _BATCH_LIST_CHUNK):
+        chunk = _BATCH_ITEMS_ADAPTER.dump_json(
+            [BatchResponse.from_record(r) for r in records[start : start + _BATCH_LIST_CHUNK]]
+        )
+        yield (b"," if start else b"") + chunk[1:-1]
+    yield b"]}"
 
 
 @app.get("/v1/batches/{batch_id}", response_model=BatchResponse)
-async def get_batch(batch_id: str) -> BatchResponse:
+async def get_batch(batch_id: str) -> Response:
     """Fetch one batch by id."""
 
-    batch = await container.service.get_batch(batch_id)
+    batch = await _container().service.get_batch(batch_id)
     if batch is None:
         raise HTTPException(status_code=404, detail="batch not found")
-    return BatchResponse.from_record(batch)
+    return _model_response(BatchResponse.from_record(batch))
 
 
 @app.get("/v1/batches/{batch_id}/review-rows", response_model=BatchReviewRowsResponse)
-async def get_batch_review_rows(batch_id: str, request: Request) -> BatchReviewRowsResponse:
+async def get_batch_review_rows(
+    batch_id: str,
+    request: Request,
+) -> Response:
     """Return persisted review rows with API-accessible PDF preview URLs."""
 
     try:
-        batch, rows = await container.service.get_review_rows(batch_id)
+        batch, rows = await _container().service.get_review_rows(batch_id)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="batch not found") from exc
 
+    # Rows are plain JSON dicts already, so emit the BatchReviewRowsResponse shape directly
+    # instead of building one pydantic model per row and validating it again on the way out.
     base_url = str(request.base_url).rstrip("/")
+    preview_prefix = f"{base_url}/v1/batches/{batch_id}/files/"
     items = []
     for idx, row in enumerate(rows, start=1):
         row_id = str(row.get("row_id") or f"row-{idx:04d}")
         preview_url = None
         if row.get("preview_path"):
-            preview_url = f"{base_url}/v1/batches/{batch_id}/files/{row_id}/preview"
+            preview_url = preview_prefix + row_id + "/preview"
         items.append(
-            BatchReviewRow(
-                row_id=row_id,
-                category=str(row.get("category") or ""),
-                filename=str(row.get("filename") or ""),
-                result=dict(row.get("result") or {}),
-                score=dict(row.get("score") or {}),
-                preview_url=preview_url,
-            )
+            {
+                "row_id": row_id,
+                "category": str(row.get("category") or ""),
+                "filename": str(row.get("filename") or ""),
+                # Serialized straight away and never mutated, so the stored dicts are passed by reference.
+                "result": row.get("result") or {},
+                "score": row.get("score") or {},
+                "preview_url": preview_url,
+            }
         )
-    return BatchReviewRowsResponse(batch_id=batch.batch_id, status=batch.status, rows=items)
+    return ORJSONResponse(
+        {
+            "schema_version": SCHEMA_VERSION,
+            "batch_id": batch.batch_id,
+            "status": batch.status.value,
+            "rows": items,
+        }
+    )
 
 
 @app.get("/v1/batches/{batch_id}/files/{file_key}/preview")
@@ -313,33 +420,33 @@ async def get_batch_preview_pdf(batch_id: str, file_key: str) -> FileResponse:
     """Serve one batch preview PDF by stable review row id."""
 
     try:
-        _, rows = await container.service.get_review_rows(batch_id)
+        selected_row = await _container().service.get_review_row(batch_id, file_key)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="batch not found") from exc
 
-    selected_row = None
-    for idx, row in enumerate(rows, start=1):
-        row_id = str(row.get("row_id") or f"row-{idx:04d}")
-        if row_id == file_key:
-            selected_row = row
-            break
     if selected_row is None:
         raise HTTPException(status_code=404, detail="preview file not found")
 
     preview_raw = selected_row.get("preview_path")
     if not preview_raw:
         raise HTTPException(status_code=404, detail="preview file not found")
-    preview_path = _safe_preview_path(batch_id, str(preview_raw))
-    return FileResponse(path=preview_path, media_type="application/pdf", filename=preview_path.name)
+    preview_path, stat_result = _safe_preview_path(batch_id, str(preview_raw))
+    return FileResponse(
+        path=preview_path,
+        media_type="application/pdf",
+        filename=preview_path.name,
+        stat_result=stat_result,
+        headers={"Cache-Control": _PREVIEW_CACHE_CONTROL},
+    )
 
 
 @app.put("/v1/batches/{batch_id}/review", response_model=BatchResponse)
-async def submit_review(batch_id: str, req: SubmitReviewRequest) -> BatchResponse:
+async def submit_review(batch_id: str, req: SubmitReviewRequest) -> Response:
     """Store human-reviewed rows for a batch."""
 
     try:
-        record = await container.service.save_review(batch_id, req)
-        return BatchResponse.from_record(record)
+        record = await _container().service.save_review(batch_id, req)
+        return _model_response(BatchResponse.from_record(record))
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="batch not found") from exc
     except ValueError as exc:
@@ -350,10 +457,10 @@ async def submit_review(batch_id: str, req: SubmitReviewRequest) -> BatchRespons
 async def upload_local_merge_source(
     batch_id: str,
     file: UploadFile = File(...),
-) -> MergeSourceLocalResponse:
+) -> Response:
     """Upload monthly local Excel source and persist path for merge fallback usage."""
 
-    existing = await container.service.get_batch(batch_id)
+    existing = await _container().service.get_batch(batch_id)
     if existing is None:
         raise HTTPException(status_code=404, detail="batch not found")
     _validate_excel_upload(file, field_name="file")
@@ -365,21 +472,23 @@ async def upload_local_merge_source(
         index=1,
         forced_suffix=None,
     )
-    batch = await container.service.save_merge_source_local(batch_id, str(saved_path.resolve()))
-    return MergeSourceLocalResponse(
-        batch_id=batch.batch_id,
-        monthly_excel_path=str(saved_path.resolve()),
-        created_at=batch.updated_at,
+    batch = await _container().service.save_merge_source_local(batch_id, str(saved_path.resolve()))
+    return _model_response(
+        MergeSourceLocalResponse(
+            batch_id=batch.batch_id,
+            monthly_excel_path=str(saved_path.resolve()),
+            created_at=batch.updated_at,
+        )
     )
 
 
 @app.post("/v1/batches/{batch_id}/merge", response_model=MergeTaskResponse)
-async def queue_merge(batch_id: str, req: MergeRequest) -> MergeTaskResponse:
+async def queue_merge(batch_id: str, req: MergeRequest) -> Response:
     """Enqueue merge task for a reviewed batch."""
 
     try:
-        task = await container.service.request_merge(batch_id, req)
-        return MergeTaskResponse.from_task(task)
+        task = await _container().service.request_merge(batch_id, req)
+        return _model_response(MergeTaskResponse.from_task(task))
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="batch not found") from exc
     except ValueError as exc:
@@ -391,12 +500,25 @@ def run() -> None:
 
     import uvicorn
 
+    # Multiple workers need reload=False and an app import string (both already the case here),
+    # but every process builds its own in-memory repo/queue: a batch created in one process is
+    # invisible to the others and its task never reaches their inline worker. Refuse until the
+    # container is backed by a shared store.
+    workers = int(os.getenv("WORKERS", "1"))
+    if workers > 1:
+        raise SystemExit(
+            "WORKERS>1 is not supported with the in-memory batch store; run a single worker."
+        )
+
     # Start local HTTP server with env-configurable host and port.
+    # loop/http stay "auto": uvicorn then picks uvloop + httptools (installed via uvicorn[standard]
+    # in the web extra) and falls back to asyncio + h11 where they are unavailable, e.g. Windows.
     uvicorn.run(
         "bills_analysis.api.main:app",
         host=os.getenv("HOST", "127.0.0.1"),
         port=int(os.getenv("PORT", "8000")),
         reload=False,
+        workers=workers,
     )
 
 
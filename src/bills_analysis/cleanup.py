@@ -1,36 +1,66 @@
 from __future__ import annotations
 
+import os
 import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Iterable
+from types import TracebackType
+from typing import Any, Callable, Iterable
 
 
 def collect_paths(root: Path, patterns: Iterable[str]) -> list[Path]:
-    paths: list[Path] = []
-    for pattern in patterns:
-        paths.extend(root.glob(pattern))
-    # Deduplicate while preserving order
-    seen = set()
-    uniq: list[Path] = []
-    for p in paths:
-        if p in seen:
-            continue
-        seen.add(p)
-        uniq.append(p)
-    return uniq
+    """Return the paths under root matching any glob pattern, without duplicates."""
 
+    # Deduplicate while preserving order (dict keeps first-insertion order)
+    return list(dict.fromkeys(chain.from_iterable(root.glob(pattern) for pattern in patterns)))
 
-def cleanup_paths(paths: Iterable[Path], *, dry_run: bool = True) -> list[Path]:
-    deleted: list[Path] = []
-    for path in paths:
-        if not path.exists():
-            continue
-        if dry_run:
-            deleted.append(path)
-            continue
-        if path.is_dir():
-            shutil.rmtree(path)
+
+_DELETE_WORKERS = 32
+
+
+def _ignore_missing(
+    func: Callable[..., Any],
+    path: str,
+    exc_info: tuple[type[BaseException], BaseException, TracebackType | None],
+) -> None:
+    """rmtree error hook that tolerates entries already gone and re-raises everything else."""
+
+    # Overlapping targets may be removed by another worker mid-walk; anything else still raises.
+    if not issubclass(exc_info[0], FileNotFoundError):
+        raise exc_info[1]
+
+
+def _delete_path(path: Path) -> bool:
+    """Delete one file, symlink or directory tree; return False if it no longer exists."""
+
+    try:
+        # One lstat decides file vs directory; a symlink is unlinked, never followed.
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    try:
+        if stat.S_ISDIR(st.st_mode):
+            shutil.rmtree(path, onerror=_ignore_missing)
         else:
             path.unlink()
-        deleted.append(path)
-    return deleted
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def cleanup_paths(paths: Iterable[Path], *, dry_run: bool = True) -> list[Path]:
+    """Delete the given paths (or only list them on a dry run) and return those that existed."""
+
+    targets = list(dict.fromkeys(paths))
+    if dry_run:
+        # lexists mirrors the lstat in _delete_path, so dangling symlinks are listed too.
+        return [path for path in targets if os.path.lexists(path)]
+    if len(targets) <= 1:
+        removed = [_delete_path(path) for path in targets]
+    else:
+        # Deletion is syscall-bound and releases the GIL, so threads overlap the filesystem waits.
+        with ThreadPoolExecutor(max_workers=min(_DELETE_WORKERS, len(targets))) as executor:
+            removed = list(executor.map(_delete_path, targets))
+    return [path for path, ok in zip(targets, removed) if ok]
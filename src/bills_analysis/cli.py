@@ -1,27 +1,21 @@
 from __future__ import annotations
 
-import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, List, Set
+from typing import Iterable, Iterator, List, Set
 
 import typer
 from rich.console import Console
 
 from .contracts import ExtractionResult, FieldCandidate, WarningItem
-from .preprocess import detect_pdf_has_text_layer, preprocess_pages
-from .render import render_pdf_to_images
-from .vlm import DEFAULT_PROMPT, infer_invoice_with_ollama
+from .vlm import infer_invoice_with_ollama, prompts_dict
 
 app = typer.Typer(help="Invoice VLM extraction CLI (skeleton).")
 console = Console()
 
-
-def _ensure_src_on_path() -> None:
-    """Allow running `python cli/main.py` without installation."""
-    repo_root = Path(__file__).resolve().parents[1]
-    src_dir = repo_root / "src"
-    if src_dir.exists():
-        sys.path.insert(0, str(src_dir))
+_GLOB_CHARS = frozenset("*?")
 
 
 def _write_placeholder(
@@ -31,12 +25,13 @@ def _write_placeholder(
     pages,
     meta_extra: dict | None = None,
     warnings: list[WarningItem] | None = None,
+    fields: list[FieldCandidate] | None = None,
 ) -> Path:
-    """Write a stub extraction.json that follows the contract."""
+    """Write extraction.json in one pass; pretty-printed only when debugging."""
     result = ExtractionResult(
         document_name=document_name,
         pages=pages,
-        fields=[],
+        fields=fields or [],
         warnings=warnings or [],
         artifacts={},
         meta={
@@ -47,39 +42,142 @@ def _write_placeholder(
     )
     out_dir.mkdir(parents=True, exist_ok=True)
     output_path = out_dir / "extraction.json"
-    output_path.write_text(result.model_dump_json(indent=2), encoding="utf-8")
+    # The core serializer returns UTF-8 bytes directly; no str round-trip before the write.
+    output_path.write_bytes(
+        ExtractionResult.__pydantic_serializer__.to_json(result, indent=2 if debug else None)
+    )
     return output_path
 
 
+def _walk_pdfs(root: str) -> Iterator[str]:
+    """Yield PDF file paths under `root` in rglob order, using os.scandir entries directly."""
+
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except PermissionError:
+            continue
+        subdirs: list[str] = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                yield entry.path
+        # Reversed so the stack visits subdirectories in scandir order (pre-order, like rglob).
+        stack.extend(reversed(subdirs))
+
+
 def _iter_pdfs(inputs: Iterable[str]) -> Iterable[Path]:
     """Expand provided paths, directories, or glob patterns into PDF files."""
 
-    seen: Set[Path] = set()
+    # Dedup on resolved string keys so "./a.pdf" and "a.pdf" are one target.
+    seen: Set[str] = set()
+
+    def _unseen(candidate: str | Path) -> bool:
+        key = os.path.realpath(candidate)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
     for raw in inputs:
         path = Path(raw)
 
         # Glob pattern expansion (e.g., data/samples/**/*.pdf)
-        if any(char in raw for char in ["*", "?"]):
+        if not _GLOB_CHARS.isdisjoint(raw):
             for match in path.parent.glob(path.name):
-                if match.is_file() and match.suffix.lower() == ".pdf" and match not in seen:
-                    seen.add(match)
+                if match.is_file() and match.suffix.lower() == ".pdf" and _unseen(match):
                     yield match
             continue
 
         # Directory expansion
         if path.is_dir():
-            for match in path.rglob("*.pdf"):
-                if match not in seen:
-                    seen.add(match)
-                    yield match
+            for match in _walk_pdfs(raw):
+                if _unseen(match):
+                    yield Path(match)
             continue
 
         # Single file (even if it doesn't exist yet, we pass it through)
-        if path not in seen:
-            seen.add(path)
+        if _unseen(path):
             yield path
 
 
+def _check_purpose(value: str) -> str:
+    """Reject prompt sets the VLM module does not define."""
+
+    if value not in prompts_dict:
+        raise typer.BadParameter(f"must be one of: {', '.join(sorted(prompts_dict))}")
+    return value
+
+
+def _process_one_pdf(
+    pdf: Path,
+    out: Path,
+    dpi: int,
+    preprocess: bool,
+    force_preprocess: bool,
+    model: str,
+    base_url: str,
+    temperature: float,
+    purpose: str,
+    debug: bool,
+) -> Path:
+    """Run render, preprocess and VLM extraction for one PDF of a batch."""
+
+    # PyMuPDF/Pillow load here rather than at import, so --help and dispatch stay fast.
+    from .preprocess import detect_pdf_has_text_layer, preprocess_pages
+    from .render import render_pdf_to_images
+
+    run_dir = out / pdf.stem
+    has_text_layer = detect_pdf_has_text_layer(pdf)
+    pages = render_pdf_to_images(pdf, run_dir / "pages", dpi=dpi)
+    pages = preprocess_pages(
+        pages,
+        output_dir=run_dir / "preproc",
+        enable=preprocess and (force_preprocess or not has_text_layer),
+    )
+
+    fields, vlm_meta = infer_invoice_with_ollama(
+        pages,
+        purpose,
+        model=model,
+        base_url=base_url,
+        temperature=temperature,
+    )
+
+    warning_items: list[WarningItem] = []
+    if vlm_meta.get("vlm_error"):
+        warning_items.append(
+            WarningItem(
+                code="VLM_ERROR",
+                message=f"Vision model call failed: {vlm_meta['vlm_error']}",
+                severity="error",
+            )
+        )
+
+    return _write_placeholder(
+        run_dir,
+        pdf.name,
+        debug,
+        pages=pages,
+        meta_extra={
+            "renderer": "pymupdf",
+            "dpi": str(dpi),
+            "has_text_layer": str(has_text_layer),
+            "preprocess_enabled": str(preprocess and (force_preprocess or not has_text_layer)),
+            "force_preprocess": str(force_preprocess),
+            "vlm_model": vlm_meta.get("vlm_model", ""),
+            "vlm_base_url": vlm_meta.get("vlm_base_url", ""),
+            "vlm_error": vlm_meta.get("vlm_error", ""),
+        },
+        warnings=warning_items,
+        fields=fields,
+    )
+
+
 @app.command()
 def extract(
     pdf_path: Path,
@@ -92,9 +190,10 @@ def extract(
     model: str = typer.Option("qwen3-vl:4b", help="Ollama model to query."),
     base_url: str = typer.Option("http://localhost:11434", help="Ollama base URL."),
     temperature: float = typer.Option(0.0, help="Sampling temperature for the VLM."),
-    prompt: str = typer.Option(
-        DEFAULT_PROMPT,
-        help="Prompt sent to the VLM. Keep concise; must instruct JSON output.",
+    purpose: str = typer.Option(
+        "bar",
+        help="Prompt set sent to the VLM (one of: bar, zbon).",
+        callback=_check_purpose,
         rich_help_panel="Advanced",
     ),
     debug: bool = False,
@@ -106,6 +205,9 @@ def extract(
     into `out`. This stub only creates the output folder and a placeholder JSON.
     """
 
+    from .preprocess import detect_pdf_has_text_layer, preprocess_pages
+    from .render import render_pdf_to_images
+
     console.print(f"[cyan]Running skeleton extract for[/cyan] {pdf_path}")
     has_text_layer = detect_pdf_has_text_layer(pdf_path)
     pages = render_pdf_to_images(pdf_path, out / "pages", dpi=dpi)
@@ -117,7 +219,7 @@ def extract(
 
     fields, vlm_meta = infer_invoice_with_ollama(
         pages,
-        prompt=prompt,
+        purpose,
         model=model,
         base_url=base_url,
         temperature=temperature,
@@ -149,13 +251,8 @@ def extract(
             "vlm_error": vlm_meta.get("vlm_error", ""),
         },
         warnings=warning_items,
+        fields=fields,
     )
-    if fields:
-        placeholder_data = ExtractionResult.model_validate_json(
-            placeholder.read_text(encoding="utf-8")
-        )
-        placeholder_data.fields = fields
-        placeholder.write_text(placeholder_data.model_dump_json(indent=2), encoding="utf-8")
     console.print(f"[green]Wrote placeholder[/green] {placeholder}")
 
 
@@ -174,11 +271,19 @@ def batch(
     model: str = typer.Option("qwen3-vl:4b", help="Ollama model to query."),
     base_url: str = typer.Option("http://localhost:11434", help="Ollama base URL."),
     temperature: float = typer.Option(0.0, help="Sampling temperature for the VLM."),
-    prompt: str = typer.Option(
-        DEFAULT_PROMPT,
-        help="Prompt sent to the VLM. Keep concise; must instruct JSON output.",
+    purpose: str = typer.Option(
+        "bar",
+        help="Prompt set sent to the VLM (one of: bar, zbon).",
+        callback=_check_purpose,
         rich_help_panel="Advanced",
     ),
+    workers: int = typer.Option(
+        1,
+        help=(
+            "Number of PDFs processed in parallel (separate processes). "
+            "Each worker queries the VLM concurrently; raise only if the backend can keep up."
+        ),
+    ),
     debug: bool = False,
 ) -> None:
     """
@@ -193,62 +298,28 @@ def batch(
         console.print("[yellow]No PDFs matched pattern; nothing to do.[/yellow]")
         raise typer.Exit(code=0)
 
-    for pdf in targets:
-        run_dir = out / pdf.stem
-        has_text_layer = detect_pdf_has_text_layer(pdf)
-        pages = render_pdf_to_images(pdf, run_dir / "pages", dpi=dpi)
-        pages = preprocess_pages(
-            pages,
-            output_dir=run_dir / "preproc",
-            enable=preprocess and (force_preprocess or not has_text_layer),
-        )
-
-        fields, vlm_meta = infer_invoice_with_ollama(
-            pages,
-            prompt=prompt,
-            model=model,
-            base_url=base_url,
-            temperature=temperature,
-        )
-
-        warning_items: list[WarningItem] = []
-        if vlm_meta.get("vlm_error"):
-            warning_items.append(
-                WarningItem(
-                    code="VLM_ERROR",
-                    message=f"Vision model call failed: {vlm_meta['vlm_error']}",
-                    severity="error",
-                )
-            )
-
-        placeholder = _write_placeholder(
-            run_dir,
-            pdf.name,
-            debug,
-            pages=pages,
-            meta_extra={
-                "renderer": "pymupdf",
-                "dpi": str(dpi),
-                "has_text_layer": str(has_text_layer),
-                "preprocess_enabled": str(preprocess and (force_preprocess or not has_text_layer)),
-                "force_preprocess": str(force_preprocess),
-                "vlm_model": vlm_meta.get("vlm_model", ""),
-                "vlm_base_url": vlm_meta.get("vlm_base_url", ""),
-                "vlm_error": vlm_meta.get("vlm_error", ""),
-            },
-            warnings=warning_items,
+    params = (dpi, preprocess, force_preprocess, model, base_url, temperature, purpose, debug)
+    workers = max(1, min(workers, len(targets)))
+    if workers == 1:
+        for pdf in targets:
+            placeholder = _process_one_pdf(pdf, out, *params)
+            console.print(f"[green]Prepared[/green] {placeholder}")
+        return
+
+    # PDFs are independent; map() keeps the report in input order.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _process_one_pdf,
+            targets,
+            repeat(out),
+            *(repeat(value) for value in params),
+            chunksize=1,
         )
-        if fields:
-            placeholder_data = ExtractionResult.model_validate_json(
-                placeholder.read_text(encoding="utf-8")
-            )
-            placeholder_data.fields = fields
-            placeholder.write_text(placeholder_data.model_dump_json(indent=2), encoding="utf-8")
-        console.print(f"[green]Prepared[/green] {placeholder}")
+        for placeholder in results:
+            console.print(f"[green]Prepared[/green] {placeholder}")
 
 
 def main() -> None:
-    _ensure_src_on_path()
     app()
 
 
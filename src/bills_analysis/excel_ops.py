@@ -1,78 +1,176 @@
 from __future__ import annotations
 
 from datetime import date, datetime
+from functools import lru_cache
 import re
-from typing import Any
+from typing import Any, Callable
+
+_RE_ISO_TIME = re.compile(r"^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}$")
+_RE_YMD_SLASH = re.compile(r"^\d{4}/\d{1,2}/\d{1,2}$")
+_RE_YMD_SLASH_TIME = re.compile(r"^\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{2}:\d{2}$")
+_RE_FLOAT_STRIP = re.compile(r"[^\d,.\-]")
 
 
 def normalize_header(text: Any) -> str:
+    """Normalize a header for matching: case- and whitespace-insensitive, "?" dropped."""
+
     if text is None:
         return ""
-    s = str(text).strip().lower()
-    s = s.replace("?", "")
-    s = " ".join(s.split())
+    # Headers and run dates repeat across items, so the string-only paths are memoized.
+    return _normalize_header_text(text if type(text) is str else str(text))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_header_text(text: str) -> str:
+    """Normalize one header string; cached because workbooks repeat the same headers."""
+
+    s = text.strip()
+    if not s:
+        return ""
+    s = s.lower()
+    if "?" in s:
+        # Dropping "?" can leave edge or doubled spaces, so always re-collapse.
+        return " ".join(s.replace("?", "").split())
+    # isprintable() is False for every whitespace char except " ", so clean headers skip the split/join.
+    if "  " in s or not s.isprintable():
+        s = " ".join(s.split())
     return s
 
 
 def normalize_date(value: Any) -> str | None:
+    """Normalize a run date of any supported type to DD/MM/YYYY, or None if unparseable."""
+
+    # Exact-str check first: JSON results are almost always strings, so skip the isinstance ladder.
+    if type(value) is str:
+        return _normalize_date_text(value)
     if value is None:
         return None
     if isinstance(value, datetime):
         return value.strftime("%d/%m/%Y")
     if isinstance(value, date):
         return value.strftime("%d/%m/%Y")
-    text = str(value).strip()
-    if not text or text.lower() == "none":
+    return _normalize_date_text(str(value))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_date_text(text: str) -> str | None:
+    """Normalize one date string to DD/MM/YYYY, or None when it is not a date."""
+
+    text = text.strip()
+    # Only a 4-char string can be "none"; skips lower()'s copy for every other value.
+    if not text or (len(text) == 4 and text.lower() == "none"):
         return None
     try:
-        if re.match(r"^\d{4}-\d{2}-\d{2}$", text):
-            dt = datetime.strptime(text, "%Y-%m-%d")
-            return dt.strftime("%d/%m/%Y")
-        if re.match(r"^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}$", text):
+        # The common 10-char forms are told apart by their separators; no regex needed.
+        # strptime only takes ASCII digits, so the parsed forms reject other decimals as before.
+        if len(text) == 10:
+            sep4, sep2 = text[4], text[2]
+            if sep4 == "-" and text[7] == "-":
+                if text.isascii() and _all_decimal(text[:4], text[5:7], text[8:]):
+                    return _format_dmy(text[8:], text[5:7], text[:4])
+                return None
+            if sep2 == "/" and text[5] == "/" and _all_decimal(text[:2], text[3:5], text[6:]):
+                return text
+            if sep2 == "." and text[5] == ".":
+                if text.isascii() and _all_decimal(text[:2], text[3:5], text[6:]):
+                    return _format_dmy(text[:2], text[3:5], text[6:])
+                return None
+        if _RE_ISO_TIME.match(text):
             dt = datetime.strptime(text, "%Y-%m-%d %H:%M:%S")
             return dt.strftime("%d/%m/%Y")
-        if re.match(r"^\d{4}/\d{1,2}/\d{1,2}$", text):
+        if _RE_YMD_SLASH.match(text):
             dt = datetime.strptime(text, "%Y/%m/%d")
             return dt.strftime("%d/%m/%Y")
-        if re.match(r"^\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{2}:\d{2}$", text):
+        if _RE_YMD_SLASH_TIME.match(text):
             dt = datetime.strptime(text, "%Y/%m/%d %H:%M:%S")
             return dt.strftime("%d/%m/%Y")
-        if re.match(r"^\d{2}/\d{2}/\d{4}$", text):
-            return text
-        if re.match(r"^\d{2}\.\d{2}\.\d{4}$", text):
-            dt = datetime.strptime(text, "%d.%m.%Y")
-            return dt.strftime("%d/%m/%Y")
     except ValueError:
         return None
     return None
 
 
+def _all_decimal(*parts: str) -> bool:
+    """Return True when every part consists only of decimal digits."""
+
+    # isdecimal() accepts exactly the characters regex \d does for str patterns.
+    return all(part.isdecimal() for part in parts)
+
+
+def _format_dmy(day: str, month: str, year: str) -> str:
+    """Validate a calendar date and format it as DD/MM/YYYY."""
+
+    # Fields are fixed-width ASCII digits, so the slices already are the DD/MM/YYYY parts.
+    parsed = date(int(year), int(month), int(day))  # raises ValueError like strptime did
+    if parsed.year < 1000:
+        # strftime's %Y padding of such years is platform-dependent; keep its output.
+        return parsed.strftime("%d/%m/%Y")
+    return f"{day}/{month}/{year}"
+
+
+def _is_dmy_slash(text: str) -> bool:
+    """Return True for a DD/MM/YYYY candidate made of ASCII digits and slashes."""
+
+    return (
+        len(text) == 10
+        and text[2] == "/"
+        and text[5] == "/"
+        and text.isascii()
+        and _all_decimal(text[:2], text[3:5], text[6:])
+    )
+
+
 def parse_datum(value: Any) -> date | None:
+    """Parse a Datum cell value of any supported type into a date, or None."""
+
+    if type(value) is str:
+        return _parse_datum_text(value)
     if value is None:
         return None
     if isinstance(value, datetime):
         return value.date()
     if isinstance(value, date):
         return value
-    text = str(value).strip()
+    return _parse_datum_text(str(value))
+
+
+@lru_cache(maxsize=4096)
+def _parse_datum_text(text: str) -> date | None:
+    """Parse one Datum string into a date, or None when no supported format matches."""
+
+    text = text.strip()
     try:
+        if _is_dmy_slash(text):
+            return date(int(text[6:]), int(text[3:5]), int(text[:2]))
         return datetime.strptime(text, "%d/%m/%Y").date()
     except ValueError:
         return None
 
 
 def normalize_datum_value(value: Any) -> str:
+    """Return a Datum cell value as a DD/MM/YYYY comparison key ("" when empty)."""
+
+    if type(value) is str:
+        return _normalize_datum_text(value)
     if value is None:
         return ""
     if isinstance(value, datetime):
         return value.strftime("%d/%m/%Y")
     if isinstance(value, date):
         return value.strftime("%d/%m/%Y")
-    text = str(value).strip()
-    parsed = parse_datum(text)
-    if parsed is not None:
-        return parsed.strftime("%d/%m/%Y")
-    return text
+    return _normalize_datum_text(str(value))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_datum_text(text: str) -> str:
+    """Normalize one Datum string to DD/MM/YYYY, keeping unparseable text as is."""
+
+    text = text.strip()
+    parsed = _parse_datum_text(text)
+    if parsed is None:
+        return text
+    if parsed.year >= 1000 and _is_dmy_slash(text):
+        return text
+    return parsed.strftime("%d/%m/%Y")
 
 
 def write_datum_cell(cell: Any, value: Any) -> None:
@@ -86,24 +184,31 @@ def write_datum_cell(cell: Any, value: Any) -> None:
 
 
 def to_float(value: Any) -> float | None:
+    """Parse an amount with "," or "." decimal marks into a float, or None."""
+
     if value is None:
         return None
     if isinstance(value, (int, float)):
         return float(value)
     text = str(value).strip()
-    if not text or text.lower() == "none":
+    if not text or (len(text) == 4 and text.lower() == "none"):
         return None
-    text = re.sub(r"[^\d,.\-]", "", text)
+    # Plain ASCII "123" / "12.50" need no stripping or separator handling.
+    if text.isascii() and text.replace(".", "", 1).isdecimal():
+        return float(text)
+    text = _RE_FLOAT_STRIP.sub("", text)
     if not text or text in {"-", ".", ","}:
         return None
-    if "," in text and "." in text:
-        if text.rfind(",") > text.rfind("."):
-            text = text.replace(".", "")
+    # One rfind per separator decides the format; the later separator is the decimal mark.
+    last_comma = text.rfind(",")
+    if last_comma != -1:
+        last_dot = text.rfind(".")
+        if last_dot == -1:
             text = text.replace(",", ".")
+        elif last_comma > last_dot:
+            text = text.replace(".", "").replace(",", ".")
         else:
             text = text.replace(",", "")
-    else:
-        text = text.replace(",", ".")
     try:
         return float(text)
     except ValueError:
@@ -111,12 +216,14 @@ def to_float(value: Any) -> float | None:
 
 
 def to_score(value: Any) -> float | None:
+    """Parse a confidence score into a float, or None when missing or invalid."""
+
     if value is None:
         return None
     if isinstance(value, (int, float)):
         return float(value)
     text = str(value).strip()
-    if not text or text.lower() == "none":
+    if not text or (len(text) == 4 and text.lower() == "none"):
         return None
     try:
         return float(text)
@@ -131,11 +238,31 @@ def threshold_for(key: str, thresholds: dict[str, Any]) -> float:
     return float(thresholds.get("default", 0.8))
 
 
-def low_confidence_fields(
+def _threshold_lookup(thresholds: dict[str, Any]) -> Callable[[str], float]:
+    """Return a memoized threshold_for over one thresholds config, for a single builder call."""
+
+    # Lazy per field, so a malformed entry still only fails when that field is checked.
+    cache: dict[str, float] = {}
+
+    def lookup(key: str) -> float:
+        """Resolve one field's threshold, computing it on first use only."""
+
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = threshold_for(key, thresholds)
+            return value
+
+    return lookup
+
+
+def _low_fields(
     result: dict[str, Any],
     score: dict[str, Any],
-    thresholds: dict[str, Any],
+    threshold_of: Callable[[str], float],
 ) -> set[str]:
+    """Return brutto/netto fields whose value is missing or scored below its threshold."""
+
     low: set[str] = set()
     fields_to_check = ["brutto", "netto"]
     for field in fields_to_check:
@@ -146,17 +273,27 @@ def low_confidence_fields(
         score_val = to_score(score.get(field))
         if field in {"brutto", "netto"} and score_val == -1:
             score_val = to_score(score.get("total_tax"))
-            if score_val is None or score_val < threshold_for("total_tax", thresholds):
+            if score_val is None or score_val < threshold_of("total_tax"):
                 low.add(field)
             continue
         if score_val is None:
             low.add(field)
             continue
-        if score_val < threshold_for(field, thresholds):
+        if score_val < threshold_of(field):
             low.add(field)
     return low
 
 
+def low_confidence_fields(
+    result: dict[str, Any],
+    score: dict[str, Any],
+    thresholds: dict[str, Any],
+) -> set[str]:
+    """Return the low-confidence fields of one item against a thresholds config."""
+
+    return _low_fields(result, score, lambda key: threshold_for(key, thresholds))
+
+
 def needs_review(
     result: dict[str, Any],
     score: dict[str, Any],
@@ -172,16 +309,18 @@ def compute_low_headers(
     *,
     max_zbon: int = 5,
 ) -> set[str]:
+    """Return the headers to highlight for one date, scoring only that date's items."""
+
+    threshold_of = _threshold_lookup(thresholds)
     low_headers: set[str] = set()
     zbon_idx = 0
     for item in items:
         result = item.get("result") or {}
-        score = item.get("score") or {}
         run_date = normalize_date(result.get("run_date")) or "UNKNOWN"
         if run_date != datum:
             continue
         category = str(item.get("category") or "").strip().lower()
-        low_fields = low_confidence_fields(result, score, thresholds)
+        low_fields = _low_fields(result, item.get("score") or {}, threshold_of)
         if not low_fields:
             continue
         if category == "zbon":
@@ -208,17 +347,38 @@ def build_rows_with_meta(
     *,
     max_zbon: int = 5,
 ) -> tuple[list[dict[str, Any]], dict[str, list[str]]]:
+    """Build daily rows and bar filenames per date; highlights are left to the fused builder."""
+
+    rows, zbon_files_by_date, _ = build_rows_and_low_headers(items, thresholds, max_zbon=max_zbon)
+    return rows, zbon_files_by_date
+
+
+def build_rows_and_low_headers(
+    items: list[dict[str, Any]],
+    thresholds: dict[str, Any],
+    *,
+    max_zbon: int = 5,
+) -> tuple[list[dict[str, Any]], dict[str, list[str]], dict[str, set[str]]]:
+    """Build daily rows, bar filenames per date and headers to highlight per date in one pass."""
+
+    # Low-confidence fields are scored once per item for both the rows and the highlights.
+    threshold_of = _threshold_lookup(thresholds)
     rows: dict[str, dict[str, Any]] = {}
     zbon_files_by_date: dict[str, list[str]] = {}
+    low_headers_by_date: dict[str, set[str]] = {}
+    # The Excel mapper scores a bar column through the first item carrying that filename.
+    low_by_filename: dict[str, set[str]] = {}
 
     for item in items:
-        category = str(item.get("category") or "").strip().lower()
         result = item.get("result") or {}
-        score = item.get("score") or {}
         run_date = normalize_date(result.get("run_date")) or "UNKNOWN"
-
-        row = rows.get(run_date)
-        if row is None:
+        category = str(item.get("category") or "").strip().lower()
+        try:
+            row = rows[run_date]
+        except KeyError:
+            # The per-date dicts are only filled here, so a new row means new entries in them too.
+            zbon_files_by_date[run_date] = zbon_files = []
+            low_headers_by_date[run_date] = low_headers = set()
             row = {
                 "Datum": run_date,
                 "Umsatz Brutto": None,
@@ -227,28 +387,48 @@ def build_rows_with_meta(
                 "Wie viel Rechnungen": 0,
                 "_zbon_count": 0,
                 "Ausgaben": [],
+                # The per-date outputs hang off the row, so an item costs one date lookup.
+                "_zbon_files": zbon_files,
+                "_low_headers": low_headers,
             }
             rows[run_date] = row
-            zbon_files_by_date.setdefault(run_date, [])
 
         brutto = to_float(result.get("brutto"))
         netto = to_float(result.get("netto"))
         store = str(result.get("store_name") or "").strip()
+        filename = str(item.get("filename") or "")
+        low_fields = _low_fields(result, item.get("score") or {}, threshold_of)
+        first_low = low_by_filename.setdefault(filename, low_fields)
+        if low_fields:
+            row["need review"] = True
 
         if category == "zbon":
             row["Umsatz Brutto"] = brutto
             row["Umsatz Netto"] = netto
+            if "brutto" in low_fields:
+                row["_low_headers"].add("Umsatz Brutto")
+            if "netto" in low_fields:
+                row["_low_headers"].add("Umsatz Netto")
         elif category == "bar":
             row["_zbon_count"] += 1
-            if len(row["Ausgaben"]) < max_zbon:
-                row["Ausgaben"].append(
-                    {"Name": store, "Brutto": brutto, "Netto": netto}
-                )
-                zbon_files_by_date[run_date].append(str(item.get("filename") or ""))
             row["Wie viel Rechnungen"] = row["_zbon_count"]
-
-        if needs_review(result, score, thresholds):
-            row["need review"] = True
+            if len(row["Ausgaben"]) >= max_zbon:
+                continue
+            row["Ausgaben"].append(
+                {"Name": store, "Brutto": brutto, "Netto": netto}
+            )
+            row["_zbon_files"].append(filename)
+            if not first_low:
+                continue
+            # Numbered by the file's "Ausgabe" column, matching the highlighted cell.
+            idx = len(row["Ausgaben"])
+            low_headers = row["_low_headers"]
+            if "store_name" in first_low:
+                low_headers.add(f"Ausgabe {idx} Name")
+            if "brutto" in first_low:
+                low_headers.add(f"Ausgabe {idx} Brutto")
+            if "netto" in first_low:
+                low_headers.add(f"Ausgabe {idx} Netto")
 
     output_rows: list[dict[str, Any]] = []
     for row in rows.values():
@@ -272,7 +452,7 @@ def build_rows_with_meta(
                 out[f"{key_base} Netto"] = None
         output_rows.append(out)
 
-    return output_rows, zbon_files_by_date
+    return output_rows, zbon_files_by_date, low_headers_by_date
 
 
 def build_rows(
@@ -285,32 +465,44 @@ def build_rows(
     return rows
 
 
-def merge_validated_row(
-    validated_headers: list[str],
-    validated_row: list[Any],
-    monthly_headers: list[str],
-) -> tuple[dict[str, Any], list[str]]:
+@lru_cache(maxsize=32)
+def _header_map(monthly_headers: tuple[Any, ...]) -> dict[str, Any]:
+    """Map normalized monthly headers to their original cell values (first occurrence wins)."""
+
+    # The monthly workbook's header row is the same for every merge into it; callers only read.
     header_map = {}
     for name in monthly_headers:
         key = normalize_header(name)
         if key and key not in header_map:
             header_map[key] = name
+    return header_map
+
+
+_NEED_REVIEW_KEY = normalize_header("need review")
+_DATUM_KEY = normalize_header("Datum")
+
+
+def merge_validated_row(
+    validated_headers: list[str],
+    validated_row: list[Any],
+    monthly_headers: list[str],
+) -> tuple[dict[str, Any], list[str]]:
+    """Map one validated row onto monthly headers; return the updates and unmatched headers."""
 
-    validated_map = {}
-    for h, v in zip(validated_headers, validated_row):
-        validated_map[normalize_header(h)] = v
+    header_map = _header_map(tuple(monthly_headers))
+    keys = [normalize_header(h) for h in validated_headers]
+    validated_map = dict(zip(keys, validated_row))
 
     updates: dict[str, Any] = {}
     missing: list[str] = []
-    for h, v in zip(validated_headers, validated_row):
-        if normalize_header(h) == normalize_header("need review"):
+    for h, key, v in zip(validated_headers, keys, validated_row):
+        if key == _NEED_REVIEW_KEY:
             continue
-        key = normalize_header(h)
         target_header = header_map.get(key)
         if target_header is None:
             missing.append(h)
             continue
-        if normalize_header(h) == normalize_header("Datum"):
+        if key == _DATUM_KEY:
             parsed_date = parse_datum(v)
             updates[target_header] = parsed_date if parsed_date is not None else v
             continue
@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import threading
+from pathlib import Path
 
 try:
     from dotenv import load_dotenv
@@ -59,18 +62,17 @@ def _fields_to_dict(fields: dict) -> dict:
 
 
 def _extract_amount(field) -> float | None:
-    # print([f"Extracting amount from field: {field}"])
+    """Return a DI field's amount from its currency or number value, else parsed from its content."""
+
     if not field:
         return None
-    if getattr(field, "value_currency", None):
-        print([f"  found value_currency: {field.value_currency}"])
-        return field.value_currency.amount
-    if getattr(field, "valueCurrency", None):
-        print([f"  found valueCurrency: {field.valueCurrency}"])
-        return field.valueCurrency.amount
-    if getattr(field, "value_number", None) is not None:
-        print([f"  found value_number: {field.value_number}"])  
-        return field.value_number
+    # SDK >= 2024-11-30 exposes value_currency; valueCurrency only matters for raw payloads.
+    currency = getattr(field, "value_currency", None) or getattr(field, "valueCurrency", None)
+    if currency:
+        return currency.amount
+    number = getattr(field, "value_number", None)
+    if number is not None:
+        return number
     # Fallback: parse content like "1.181,75"
     content = getattr(field, "content", None)
     if not content:
@@ -79,13 +81,13 @@ def _extract_amount(field) -> float | None:
     if not text:
         return None
     text = text.replace(" ", "")
-    # normalize 1.181,75 or 1,181.75
-    if "," in text and "." in text:
-        if text.rfind(",") > text.rfind("."):
-            text = text.replace(".", "")
-            text = text.replace(",", ".")
-        else:
-            text = text.replace(",", "")
+    # normalize 1.181,75 or 1,181.75; the last separator present is the decimal mark
+    comma = text.rfind(",")
+    dot = text.rfind(".")
+    if comma > dot >= 0:
+        text = text.replace(".", "").replace(",", ".")
+    elif dot > comma >= 0:
+        text = text.replace(",", "")
     else:
         text = text.replace(",", ".")
     try:
@@ -95,11 +97,49 @@ def _extract_amount(field) -> float | None:
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 _DI_CLIENT: DocumentIntelligenceClient | None = None
+_DI_CLIENT_LOCK = threading.Lock()
 _AOAI_CLIENT: AzureOpenAI | None = None
 
 
-def _get_di_client() -> DocumentIntelligenceClient:
+def _build_di_transport(max_workers: int | None = None):
+    """Build a requests transport whose pool holds one analyze and one poll connection per worker."""
+
+    import requests
+    from azure.core.pipeline.transport import RequestsTransport
+    from urllib3.util.retry import Retry
+
+    # requests pools only 10 connections per host; beyond that, concurrent polls reconnect over TLS.
+    pool_size = max(10, (max_workers or 0) * 2)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_maxsize=pool_size,
+        # azure-core applies its own retry policy, so the adapter must not retry underneath it.
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return RequestsTransport(session=session, session_owner=False)
+
+
+def _get_di_client(max_workers: int | None = None) -> DocumentIntelligenceClient:
+    """Return the shared DI client; max_workers only sizes the pool when it is first created."""
+
+    # The client is long-lived and thread-safe; env and credentials are only read on first use.
+    if _DI_CLIENT is not None:
+        return _DI_CLIENT
+    # The warmup thread and the pool workers may race here; only one of them builds the client.
+    with _DI_CLIENT_LOCK:
+        if _DI_CLIENT is not None:
+            return _DI_CLIENT
+        return _create_di_client(max_workers)
+
+
+def _create_di_client(max_workers: int | None) -> DocumentIntelligenceClient:
+    """Build the shared DI client and its pooled transport; the caller holds _DI_CLIENT_LOCK."""
+
     global _DI_CLIENT
     if _AZURE_DI_IMPORT_ERROR is not None:
         raise RuntimeError(
@@ -112,51 +152,82 @@ def _get_di_client() -> DocumentIntelligenceClient:
         raise ValueError(
             "请设置 AZURE_DI_ENDPOINT/AZURE_DI_KEY（兼容 AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT/KEY）"
         )
-    if _DI_CLIENT is None:
-        _DI_CLIENT = DocumentIntelligenceClient(
-            endpoint=endpoint,
-            credential=AzureKeyCredential(key),
-            api_version="2024-11-30",
-        )
-        print("[Azure] client created")
+    _DI_CLIENT = DocumentIntelligenceClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(key),
+        api_version="2024-11-30",
+        transport=_build_di_transport(max_workers),
+    )
+    logger.debug("[Azure] client created")
     return _DI_CLIENT
 
 
 def _get_aoai_client() -> AzureOpenAI:
+    """Return the shared Azure OpenAI client, creating it from the environment on first use."""
+
     global _AOAI_CLIENT
+    if _AOAI_CLIENT is not None:
+        return _AOAI_CLIENT
     endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
     key = os.getenv("AZURE_OPENAI_KEY")
     if not endpoint or not key:
         raise ValueError("请在环境变量中设置 AZURE_OPENAI_ENDPOINT 和 AZURE_OPENAI_KEY")
-    if _AOAI_CLIENT is None:
-        _AOAI_CLIENT = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=key,
-            api_version="2025-01-01-preview",
-        )
-        print("[AzureOpenAI] client created")
+    _AOAI_CLIENT = AzureOpenAI(
+        azure_endpoint=endpoint,
+        api_key=key,
+        api_version="2025-01-01-preview",
+    )
+    logger.debug("[AzureOpenAI] client created")
     return _AOAI_CLIENT
 
+
+def warm_up_azure_clients(*, include_openai: bool = False, max_workers: int | None = None) -> None:
+    """Create the shared clients and open one DI connection ahead of the first document.
+
+    Only network failures are tolerated; missing configuration or dependencies still raise.
+    """
+
+    from azure.core.exceptions import AzureError
+    from azure.core.rest import HttpRequest
+
+    client = _get_di_client(max_workers)
+    if include_openai:
+        _get_aoai_client()
+    try:
+        # A cheap GET primes DNS, TLS and azure-core's lazily imported pipeline policies.
+        response = client.send_request(
+            HttpRequest("GET", "/info", params={"api-version": "2024-11-30"}),
+            retry_total=0,
+        )
+        response.close()
+    except AzureError as exc:
+        logger.warning("[Azure] warmup request failed: %s", exc)
+
+
 def analyze_document_with_azure(
     image_path: str,
     model_id: str = "prebuilt-invoice",
     *,
     return_fields: bool = False,
+    file_content: bytes | None = None,
+    max_workers: int | None = None,
 ):
     """
     通用分析函数：支持指定使用 invoice 或 receipt 模型
     提取：brutto, netto, store_name, total_tax, run_date + 对应 confidence
     如果是 invoice 模型提取，则额外提取 invoice_id
+    传入 file_content 时直接使用该字节，不再重复读取 image_path
+    max_workers 为调用方并发数，仅在首次创建客户端时用于设置连接池大小
     """
-    print(f"[Azure] model_id={model_id}")   # "prebuilt-invoice" / "prebuilt-receipt"
-    print(f"[Azure] image_path={image_path}")
+    logger.debug("[Azure] model_id=%s", model_id)   # "prebuilt-invoice" / "prebuilt-receipt"
+    logger.debug("[Azure] image_path=%s", image_path)
     # print(f"[Azure] endpoint_set={bool(endpoint)} key_set={bool(key)}")
-    client = _get_di_client()
+    client = _get_di_client(max_workers)
 
     # 读取本地文件为字节流
-    with open(image_path, "rb") as f:
-        file_content = f.read()
-    print(f"[Azure] bytes_read={len(file_content)}")
+    if file_content is None:
+        file_content = Path(image_path).read_bytes()
+    logger.debug("[Azure] bytes_read=%d", len(file_content))
 
     # 根据调用前判断好的 model_id 进行分析
     # print("[Azure] begin analyze")
@@ -166,8 +237,12 @@ def analyze_document_with_azure(
         AnalyzeDocumentRequest(bytes_source=file_content)
     )
     result = poller.result(timeout=di_timeout_sec)
-    # print(json.dumps(result.as_dict(), indent=2))
-    print(f"[Azure] Finished documents_count={len(result.documents) if result.documents else 0}")
+    # Serializing the whole response is expensive; only pay for it when debug logging is on.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps(result.as_dict(), indent=2))
+        logger.debug(
+            "[Azure] Finished documents_count=%d", len(result.documents) if result.documents else 0
+        )
 
     extracted_data = {
         "model_used": model_id,
@@ -189,7 +264,7 @@ def analyze_document_with_azure(
         fields = doc.fields
         fields_dict = _fields_to_dict(fields)
         # print(fields)
-        print(f"[Azure] fields keys: {list(fields.keys())}")
+        logger.debug("[Azure] fields keys: %s", list(fields))
         # 1. Store Name 提取
         if model_id == "prebuilt-receipt":
             f_merchant = fields.get("MerchantName")
@@ -207,11 +282,15 @@ def analyze_document_with_azure(
             f_total = fields.get("Total") or fields.get("InvoiceTotal")
         else:
             f_total = fields.get("InvoiceTotal") or fields.get("Total")
-        print(f"[Azure] f_total field: {f_total}")
+        logger.debug("[Azure] f_total field: %s", f_total)
         if f_total:
             extracted_data["brutto"] = _extract_amount(f_total)
             extracted_data["confidence_brutto"] = f_total.confidence
-        print(f"[Azure] brutto={extracted_data['brutto']} conf={extracted_data['confidence_brutto']}")
+        logger.debug(
+            "[Azure] brutto=%s conf=%s",
+            extracted_data["brutto"],
+            extracted_data["confidence_brutto"],
+        )
 
         # 3. Netto (净额) 提取
         # 官方文档显示两者均对应 Subtotal 字段
@@ -219,18 +298,22 @@ def analyze_document_with_azure(
         if f_subtotal:
             extracted_data["netto"] = _extract_amount(f_subtotal)
             extracted_data["confidence_netto"] = f_subtotal.confidence
-            print(f"[Azure] subtotal={extracted_data['netto']} conf={extracted_data['confidence_netto']}")
+            logger.debug(
+                "[Azure] subtotal=%s conf=%s",
+                extracted_data["netto"],
+                extracted_data["confidence_netto"],
+            )
 
         # 4. TotalTax 提取（同时作为 brutto/netto 兜底）
+        f_total_tax = fields.get("TotalTax")
         if extracted_data["brutto"] is None or extracted_data["netto"] is None:
-            f_total_tax = fields.get("TotalTax")
             total_tax = None
             if f_total_tax:
                 total_tax = _extract_amount(f_total_tax)
                 extracted_data["total_tax"] = total_tax
                 extracted_data["confidence_total_tax"] = f_total_tax.confidence
             if total_tax is not None:
-                print(f"[Azure] TotalTax={total_tax} used for fallback")
+                logger.debug("[Azure] TotalTax=%s used for fallback", total_tax)
                 if extracted_data["brutto"] is None and extracted_data["netto"] is not None:
                     extracted_data["brutto"] = round(extracted_data["netto"] + total_tax, 2)
                     extracted_data["confidence_brutto"] = -1
@@ -238,16 +321,14 @@ def analyze_document_with_azure(
                     extracted_data["netto"] = round(extracted_data["brutto"] - total_tax, 2)
                     extracted_data["confidence_netto"] = -1
             else:
-                print("[Azure] TotalTax missing; cannot infer brutto/netto")
-        else:
-            f_total_tax = fields.get("TotalTax")
-            if f_total_tax:
-                extracted_data["total_tax"] = (
-                    f_total_tax.value_currency.amount
-                    if f_total_tax.value_currency
-                    else f_total_tax.value_number
-                )
-                extracted_data["confidence_total_tax"] = f_total_tax.confidence
+                logger.debug("[Azure] TotalTax missing; cannot infer brutto/netto")
+        elif f_total_tax:
+            extracted_data["total_tax"] = (
+                f_total_tax.value_currency.amount
+                if f_total_tax.value_currency
+                else f_total_tax.value_number
+            )
+            extracted_data["confidence_total_tax"] = f_total_tax.confidence
 
         # 5. Invoice ID (仅限 Invoice 模型)
         if model_id == "prebuilt-invoice":
@@ -255,47 +336,46 @@ def analyze_document_with_azure(
             extracted_data["invoice_id"] = f_inv_id.value_string.replace(" ", "") if f_inv_id else None
             extracted_data["confidence_invoice_id"] = f_inv_id.confidence if f_inv_id else None
 
-    print(f"[Azure] extracted_data for this page:\n{extracted_data}")
+    logger.debug("[Azure] extracted_data for this page:\n%s", extracted_data)
     if return_fields:
         return extracted_data, fields_dict
     return extracted_data
 
 
+# 冗余的视觉和位置信息
+_CLEAN_SKIP_KEYS = frozenset({"boundingRegions", "polygon", "spans", "confidence"})
+
+
 def clean_invoice_json(data):
     """
-    递归清理 Azure DI 返回的 JSON，仅保留核心业务字段。
+    原地清理 Azure DI 返回的 JSON（迭代遍历，不递归），仅保留核心业务字段。
     """
-    if isinstance(data, dict):
-        # 定义需要保留的关键字段
-        # 我们可以保留 type 来帮助 GPT 理解数据格式
-        cleaned = {}
-        for k, v in data.items():
-            # 跳过冗余的视觉和位置信息
-            if k in ['boundingRegions', 'polygon', 'spans', 'confidence']:
-                continue
-            
-            # 递归处理内容
-            res = clean_invoice_json(v)
-            if res is not None:
-                cleaned[k] = res
-        return cleaned
-    
-    elif isinstance(data, list):
-        return [clean_invoice_json(item) for item in data]
-    
-    else:
-        # 返回基础类型数据 (str, int, float, bool)
-        return data
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k in list(node):
+                v = node[k]
+                # 跳过冗余字段与空值；我们保留 type 来帮助 GPT 理解数据格式
+                if k in _CLEAN_SKIP_KEYS or v is None:
+                    del node[k]
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+    return data
 
 def test_clean_invoice_json():
     # 使用示例
     with open('tmp_invoice_3.json', 'r', encoding='utf-8') as f:
         raw_data = json.load(f)
 
+    # clean_invoice_json 原地修改，先记录原始大小
+    raw_len = len(json.dumps(raw_data))
     minimized_data = clean_invoice_json(raw_data)
 
     # 打印对比结果
-    print(f"原始字符数: {len(json.dumps(raw_data))}")
+    print(f"原始字符数: {raw_len}")
     print(f"清理后字符数: {len(json.dumps(minimized_data))}")
 
     # 保存为精简版供 GPT 使用
@@ -313,10 +393,7 @@ def test_analyze_invoice_with_azure():
     analyze_document_with_azure(img_path, model_id="prebuilt-invoice")
 
 
-def extract_office_invoice_azure(distilled_data: dict):
-    client = _get_aoai_client()
-    # print(f"[AzureOpenAI] Extracting office invoice category with distilled data: {distilled_data}")
-    prompt = """
+_OFFICE_SYS_PROMPT = """
         ### Role
         You are a professional financial assistant specializing in invoice data extraction and classification.
 
@@ -379,12 +456,22 @@ def extract_office_invoice_azure(distilled_data: dict):
         }
     """
 
+
+def extract_office_invoice_azure(distilled_data: dict):
+    """Classify distilled OFFICE invoice fields with Azure OpenAI; return {} on non-JSON output."""
+
+    client = _get_aoai_client()
+
     aoai_timeout_sec = float(os.getenv("AOAI_TIMEOUT_SEC", "60"))
     response = client.chat.completions.create(
         model="gpt-4o-mini", # 这里填你的 Deployment Name
+        # A fixed system message first lets Azure OpenAI reuse the cached prompt prefix.
         messages=[
-            {"role": "user", "content": prompt},
-            {"role": "user", "content": f"Do classify: {json.dumps(distilled_data)}"}
+            {"role": "system", "content": _OFFICE_SYS_PROMPT},
+            {
+                "role": "user",
+                "content": f"Do classify: {json.dumps(distilled_data, separators=(',', ':'))}",
+            },
         ],
         response_format={"type": "json_object"},
         temperature=0.0,
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
+import os
+import tempfile
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Iterable
 
@@ -11,7 +17,12 @@ import fitz  # PyMuPDF
 
 from bills_analysis.vlm import prompts_dict
 
+logger = logging.getLogger(__name__)
+
 THRESHOLD_RECEIPT_RATIO = 2.0
+_DI_MODEL_IDS = ("prebuilt-invoice", "prebuilt-receipt")
+# Part of every cache key; bump it whenever analyze_document_with_azure's result shape changes.
+_AZURE_CACHE_VERSION = 1
 
 
 def get_pdf_page_ratio(doc: fitz.Document) -> float | None:
@@ -30,14 +41,21 @@ def get_pdf_page_ratio(doc: fitz.Document) -> float | None:
     return height / width
 
 
-def get_archive_subdir_name(run_date: str, category: str) -> str:
-    """Build archive folder naming convention used by legacy scripts."""
+@lru_cache(maxsize=8)
+def _parse_run_date(run_date: str) -> datetime | None:
+    """Parse a DD/MM/YYYY run date once per batch instead of once per PDF."""
 
     try:
-        dt = datetime.strptime(run_date, "%d/%m/%Y")
-        yymm = f"{dt.year % 100:02d}{dt.month:02d}"
+        return datetime.strptime(run_date, "%d/%m/%Y")
     except ValueError:
-        yymm = "0000"
+        return None
+
+
+def get_archive_subdir_name(run_date: str, category: str) -> str:
+    """Build archive folder naming convention used by legacy scripts."""
+
+    dt = _parse_run_date(run_date)
+    yymm = f"{dt.year % 100:02d}{dt.month:02d}" if dt is not None else "0000"
     cat = category.strip().lower()
     if cat == "office":
         return f"{yymm}DO Qonto Zahlungsausgang"
@@ -53,11 +71,10 @@ def get_compressed_pdf_name(category: str, extracted_kv: dict[str, Any], run_dat
 
     cat = category.strip().lower()
     if cat == "office":
-        try:
-            dt = datetime.strptime(run_date, "%d/%m/%Y")
-            yymm = f"{dt.year % 100:02d}{dt.month:02d}"
-        except ValueError:
+        dt = _parse_run_date(run_date)
+        if dt is None:
             return None
+        yymm = f"{dt.year % 100:02d}{dt.month:02d}"
         sender = extracted_kv.get("sender") or ""
         sender_first = str(sender).strip().split(" ")[0] if sender else ""
         brutto = extracted_kv.get("brutto") or ""
@@ -66,11 +83,10 @@ def get_compressed_pdf_name(category: str, extracted_kv: dict[str, Any], run_dat
             return f"{yymm}Do_{sender_first}_{brutto_norm}.pdf"
         return None
     if cat == "zbon":
-        try:
-            dt = datetime.strptime(run_date, "%d/%m/%Y")
-            return f"{dt.day:02d}_{dt.month:02d}_{dt.year} do.pdf"
-        except ValueError:
+        dt = _parse_run_date(run_date)
+        if dt is None:
             return None
+        return f"{dt.day:02d}_{dt.month:02d}_{dt.year} do.pdf"
     if cat == "bar":
         store_name = extracted_kv.get("store_name") or ""
         brutto = extracted_kv.get("brutto") or ""
@@ -94,13 +110,178 @@ def calc_proc_time(start: float) -> tuple[float, float]:
     return time_now, time_now - start
 
 
+def _azure_cache_dir() -> Path:
+    """Return the on-disk Azure result cache root (override with BILLS_AZURE_CACHE)."""
+
+    return Path(os.getenv("BILLS_AZURE_CACHE", "~/.cache/bills_analysis")).expanduser() / "azure"
+
+
+def _load_cached_azure(
+    path: Path, need_fields: bool
+) -> tuple[dict[str, Any], dict[str, Any] | None] | None:
+    """Return a cached (result, raw fields) pair, or None on a miss or an entry lacking fields."""
+
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict):
+        return None
+    result = entry.get("result")
+    fields = entry.get("fields")
+    if not isinstance(result, dict) or not isinstance(fields, (dict, type(None))):
+        return None
+    if need_fields and fields is None:
+        return None
+    return result, fields
+
+
+def _store_cached_azure(path: Path, result: dict[str, Any], fields: dict[str, Any] | None) -> None:
+    """Write a cache entry atomically; a failed write is logged and the run carries on."""
+
+    tmp_name = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+        ) as f:
+            tmp_name = f.name
+            json.dump({"result": result, "fields": fields}, f, ensure_ascii=False)
+        os.replace(tmp_name, path)
+        tmp_name = None
+    except (OSError, TypeError, ValueError) as exc:
+        logger.warning("[Azure] cache write failed: %s: %s", path, exc)
+    finally:
+        if tmp_name is not None:
+            Path(tmp_name).unlink(missing_ok=True)
+
+
+def _warm_up_azure(include_openai: bool, max_workers: int) -> None:
+    """Pay client setup and the first TLS handshake while the first PDFs are preprocessed."""
+
+    from bills_analysis.extract_by_azure_api import warm_up_azure_clients
+
+    warm_up_azure_clients(include_openai=include_openai, max_workers=max_workers)
+
+
+def _env_max_workers(default: int = 8) -> int:
+    """Read AZURE_MAX_WORKERS, falling back to the default when it is unset or not an integer."""
+
+    raw = os.getenv("AZURE_MAX_WORKERS")
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"[Azure] AZURE_MAX_WORKERS 不是整数: {raw!r}，使用默认值 {default}")
+        return default
+
+
 class AzurePipelineAdapter:
     """Adapter that preserves legacy test pipeline behavior in src architecture."""
 
-    def __init__(self, *, max_workers: int = 4) -> None:
-        """Initialize adapter with configurable worker parallelism."""
-
-        self.max_workers = max_workers
+    def __init__(
+        self,
+        *,
+        max_workers: int | None = None,
+        warmup: bool = True,
+        use_cache: bool = False,
+    ) -> None:
+        """Initialize adapter with worker parallelism, client warmup and Azure result caching."""
+
+        if max_workers is None:
+            max_workers = _env_max_workers()
+        self.max_workers = max(1, max_workers)
+        self.warmup = warmup
+        self.cache_dir = _azure_cache_dir() if use_cache else None
+
+    def _cache_path(self, model_id: str, digest: str) -> Path:
+        """Return the cache entry path for one model and PDF content digest."""
+
+        return self.cache_dir / f"v{_AZURE_CACHE_VERSION}_{model_id}_{digest}.json"
+
+    @staticmethod
+    def _pdf_digest(pdf_path: Path, pdf_bytes: bytes, digests: dict[Path, str]) -> str:
+        """Return the SHA-256 of a PDF, hashing each path at most once per run."""
+
+        digest = digests.get(pdf_path)
+        if digest is None:
+            digest = digests[pdf_path] = hashlib.sha256(pdf_bytes, usedforsecurity=False).hexdigest()
+        return digest
+
+    def _all_cached(self, pdf_list: list[str], digests: dict[Path, str]) -> bool:
+        """Return True when every input PDF already has a cache entry for either DI model."""
+
+        if self.cache_dir is None:
+            return False
+        for pdf in pdf_list:
+            pdf_path = Path(pdf)
+            digest = digests.get(pdf_path)
+            if digest is None:
+                try:
+                    digest = self._pdf_digest(pdf_path, pdf_path.read_bytes(), digests)
+                except OSError:
+                    return False
+            if not any(self._cache_path(model_id, digest).is_file() for model_id in _DI_MODEL_IDS):
+                return False
+        return True
+
+    def _start_warmup(self, pdf_list: list[str], include_openai: bool, digests: dict[Path, str]) -> None:
+        """Warm Azure clients on a daemon thread unless every input is a cache hit."""
+
+        def _run() -> None:
+            """Check the cache first so fully cached batches never touch the network."""
+
+            if not self._all_cached(pdf_list, digests):
+                _warm_up_azure(include_openai, self.max_workers)
+
+        threading.Thread(target=_run, name="azure-warmup", daemon=True).start()
+
+    def _analyze_with_cache(
+        self,
+        pdf_path: Path,
+        model_id: str,
+        pdf_bytes: bytes | None,
+        *,
+        need_fields: bool = False,
+        digests: dict[Path, str] | None = None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Return the DI result plus cleaned fields when requested, reusing a cached entry if enabled."""
+
+        from bills_analysis.extract_by_azure_api import analyze_document_with_azure, clean_invoice_json
+
+        cache_path = None
+        if self.cache_dir is not None and pdf_bytes is not None:
+            digest = self._pdf_digest(pdf_path, pdf_bytes, {} if digests is None else digests)
+            cache_path = self._cache_path(model_id, digest)
+        if cache_path is not None:
+            cached = _load_cached_azure(cache_path, need_fields)
+            if cached is not None:
+                print(f"[Azure] 缓存命中: {pdf_path.name} | model={model_id}")
+                azure_result, fields = cached
+                return azure_result, clean_invoice_json(fields) if need_fields else {}
+
+        print(f"[Azure] 调用: {pdf_path.name} | model={model_id}")
+        fields = None
+        if need_fields:
+            azure_result, fields = analyze_document_with_azure(
+                str(pdf_path),
+                model_id=model_id,
+                return_fields=True,
+                file_content=pdf_bytes,
+                max_workers=self.max_workers,
+            )
+        else:
+            azure_result = analyze_document_with_azure(
+                str(pdf_path),
+                model_id=model_id,
+                file_content=pdf_bytes,
+                max_workers=self.max_workers,
+            )
+        # The entry keeps the raw DI fields; cleaning happens per read so it can evolve freely.
+        if cache_path is not None:
+            _store_cached_azure(cache_path, azure_result, fields)
+        return azure_result, clean_invoice_json(fields) if need_fields else {}
 
     def run_pipeline(
         self,
@@ -116,7 +297,7 @@ class AzurePipelineAdapter:
         dpi: int = 300,
         purpose: str = "zbon",
     ) -> Path:
-        """Execute the full extraction pipeline and append JSON results incrementally."""
+        """Execute the full extraction pipeline and append JSON Lines results incrementally."""
 
         timestamp = int(datetime.now().timestamp())
         if results_dir is None:
@@ -125,53 +306,51 @@ class AzurePipelineAdapter:
             raise ValueError(f"--out_dir 不能是文件: {results_dir}")
         results_dir.mkdir(parents=True, exist_ok=True)
         if results_path is None:
-            results_path = results_dir / f"results_{timestamp}.json"
-
-        def _write_results(entry: dict[str, Any]) -> None:
-            """Append one result entry into the output JSON list file."""
-
-            results_path.parent.mkdir(parents=True, exist_ok=True)
-            if not results_path.exists():
-                with results_path.open("w", encoding="utf-8") as f:
-                    json.dump([], f, ensure_ascii=False, indent=2)
-            raw = results_path.read_text(encoding="utf-8").strip()
-            if raw:
-                data = json.loads(raw)
-                if not isinstance(data, list):
-                    raise ValueError("Results file is not a JSON list.")
-            else:
-                data = []
-            data.append(entry)
-            with results_path.open("w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            results_path = results_dir / f"results_{timestamp}.jsonl"
 
         pdf_list = list(pdf_paths)
         total = len(pdf_list)
         if total == 0:
             return results_path
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [
-                executor.submit(
-                    self._process_one_pdf,
-                    idx=idx,
-                    total=total,
-                    pdf=pdf,
-                    output_root=output_root,
-                    backup_dest_dir=backup_dest_dir,
-                    category=category,
-                    run_date=run_date,
-                    max_pages=max_pages,
-                    dpi=dpi,
-                    purpose=purpose,
-                )
-                for idx, pdf in enumerate(pdf_list, start=1)
-            ]
-            for future in as_completed(futures):
-                entry = future.result()
-                if entry is None:
-                    continue
-                _write_results(entry)
+        results_file = None
+        # Per-run content digests, shared by the warmup cache probe and the workers.
+        digests: dict[Path, str] = {}
+        try:
+            if self.warmup:
+                # A separate thread keeps the warmup from occupying one of the PDF workers.
+                self._start_warmup(pdf_list, category.strip().lower() == "office", digests)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._process_one_pdf,
+                        idx=idx,
+                        total=total,
+                        pdf=pdf,
+                        output_root=output_root,
+                        backup_dest_dir=backup_dest_dir,
+                        category=category,
+                        run_date=run_date,
+                        max_pages=max_pages,
+                        dpi=dpi,
+                        purpose=purpose,
+                        digests=digests,
+                    )
+                    for idx, pdf in enumerate(pdf_list, start=1)
+                ]
+                for future in as_completed(futures):
+                    entry = future.result()
+                    if entry is None:
+                        continue
+                    # One line per entry: earlier results are never re-read or rewritten.
+                    if results_file is None:
+                        results_path.parent.mkdir(parents=True, exist_ok=True)
+                        results_file = results_path.open("a", encoding="utf-8")
+                    results_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    results_file.flush()
+        finally:
+            if results_file is not None:
+                results_file.close()
 
         return results_path
 
@@ -188,6 +367,7 @@ class AzurePipelineAdapter:
         max_pages: int,
         dpi: int,
         purpose: str,
+        digests: dict[Path, str] | None = None,
     ) -> dict[str, Any] | None:
         """Process one PDF file with extraction, scoring and archive generation."""
 
@@ -197,8 +377,11 @@ class AzurePipelineAdapter:
         is_office = category.strip().lower() == "office"
         file_type = "invoice"
         pdf_read_failed = False
+        pdf_bytes = None
         try:
-            with fitz.open(pdf_path) as doc:
+            # Read once; both fitz and the Azure request work from the same buffer.
+            pdf_bytes = pdf_path.read_bytes()
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
                 pdf_page_count = doc.page_count
                 pdf_ratio = get_pdf_page_ratio(doc)
         except Exception:
@@ -257,18 +440,9 @@ class AzurePipelineAdapter:
             result_entry["skip_reason"] = f"page_count>{max_pages}"
         else:
             try:
-                print(f"[Azure] 调用: {pdf_path.name} | model={model_id}")
-                from bills_analysis.extract_by_azure_api import analyze_document_with_azure, clean_invoice_json
-
-                if is_office:
-                    azure_result, office_fields = analyze_document_with_azure(
-                        str(pdf_path),
-                        model_id=model_id,
-                        return_fields=True,
-                    )
-                    office_fields = clean_invoice_json(office_fields)
-                else:
-                    azure_result = analyze_document_with_azure(str(pdf_path), model_id=model_id)
+                azure_result, office_fields = self._analyze_with_cache(
+                    pdf_path, model_id, pdf_bytes, need_fields=is_office, digests=digests
+                )
             except Exception as exc:
                 print(f"[Azure] 调用失败: file={pdf_path.name} model={model_id} error={exc}")
                 extracted_kv["brutto"] = None
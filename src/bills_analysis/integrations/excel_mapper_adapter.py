@@ -8,8 +8,7 @@ from openpyxl import Workbook
 from openpyxl.styles import PatternFill
 
 from bills_analysis.excel_ops import (
-    build_rows_with_meta,
-    low_confidence_fields,
+    build_rows_and_low_headers,
     normalize_date,
     threshold_for,
     to_score,
@@ -74,7 +73,8 @@ def map_daily_json_to_excel(
     items = load_results(json_path)
     thresholds_path = config_path or Path("tests/config.json")
     thresholds = load_json_object(thresholds_path, empty_message=f"Empty thresholds file: {thresholds_path}")
-    rows, zbon_files_by_date = build_rows_with_meta(items, thresholds)
+    # Rows and highlights come from one scoring pass over the items.
+    rows, zbon_files_by_date, low_headers_by_date = build_rows_and_low_headers(items, thresholds)
     if not rows:
         raise ValueError("No rows generated.")
     first = rows[0]
@@ -111,35 +111,7 @@ def map_daily_json_to_excel(
 
     header_to_col = {name: idx + 1 for idx, name in enumerate(headers)}
     data_row_idx = 2
-    low_headers = set()
-
-    for item in items:
-        result = item.get("result") or {}
-        run_date = normalize_date(result.get("run_date")) or "UNKNOWN"
-        if run_date != datum:
-            continue
-        category = str(item.get("category") or "").strip().lower()
-        if category != "zbon":
-            continue
-        low_fields = low_confidence_fields(result, item.get("score") or {}, thresholds)
-        if "brutto" in low_fields:
-            low_headers.add("Umsatz Brutto")
-        if "netto" in low_fields:
-            low_headers.add("Umsatz Netto")
-
-    zbon_files = zbon_files_by_date.get(datum, [])
-    for idx, fname in enumerate(zbon_files, start=1):
-        for item in items:
-            if str(item.get("filename") or "") != fname:
-                continue
-            low_fields = low_confidence_fields(item.get("result") or {}, item.get("score") or {}, thresholds)
-            if "store_name" in low_fields:
-                low_headers.add(f"Ausgabe {idx} Name")
-            if "brutto" in low_fields:
-                low_headers.add(f"Ausgabe {idx} Brutto")
-            if "netto" in low_fields:
-                low_headers.add(f"Ausgabe {idx} Netto")
-            break
+    low_headers = low_headers_by_date.get(datum, set())
 
     for header in low_headers:
         col = header_to_col.get(header)
@@ -240,6 +212,8 @@ def map_office_json_to_excel(
     ws.title = "Office"
     ws.append(headers)
     orange = PatternFill(start_color="FFA500", end_color="FFA500", fill_type="solid")
+    # Resolved once per workbook instead of once per row and field.
+    field_thresholds = {field: threshold_for(field, config) for field in ("brutto", "netto")}
     for row_idx, row in enumerate(rows, start=2):
         ws.append(row)
         write_datum_cell(ws.cell(row=row_idx, column=1), row[0])
@@ -248,7 +222,7 @@ def map_office_json_to_excel(
         need_review = False
         for field, header in [("brutto", "Brutto"), ("netto", "Netto")]:
             score_val = to_score(score.get(field))
-            if score_val is None or score_val < threshold_for(field, config):
+            if score_val is None or score_val < field_thresholds[field]:
                 col = headers.index(header) + 1
                 ws.cell(row=row_idx, column=col).fill = orange
                 need_review = True
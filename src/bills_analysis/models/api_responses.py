@@ -34,7 +34,8 @@ class BatchResponse(StrictModel):
         error_obj = None
         if record.error:
             error_obj = ErrorInfo(code="BATCH_ERROR", message=record.error)
-        return cls(
+        # BatchRecord is already validated, so skip re-validating every field on the way out.
+        return cls.model_construct(
             batch_id=record.batch_id,
             type=record.batch_type,
             status=record.status,
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import os
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Sequence
 
@@ -18,6 +20,14 @@ def detect_pdf_has_text_layer(pdf_path: Path, sample_pages: int = 2) -> bool:
     Heuristic: check first N pages for text. Returns True if any text found.
     """
 
+    st = os.stat(pdf_path)
+    return _detect_text_layer(os.fspath(pdf_path), st.st_mtime_ns, st.st_size, sample_pages)
+
+
+@lru_cache(maxsize=256)
+def _detect_text_layer(pdf_path: str, mtime_ns: int, size: int, sample_pages: int) -> bool:
+    """Memoized text-layer probe; mtime/size in the key invalidate edited files."""
+
     with fitz.open(pdf_path) as doc:
         for page in doc[:sample_pages]:
             text = page.get_text("text").strip()
@@ -2,14 +2,48 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 from pathlib import Path
 from typing import List
 import sys
 
 import fitz  # PyMuPDF
+from pydantic import ValidationError
 
 from .contracts import PageInfo
 
+# Written next to the PNGs so a re-run over an unchanged PDF can reuse them.
+_RENDER_MANIFEST = ".render_manifest.json"
+
+
+def _render_cache_key(pdf_path: Path, dpi: int) -> str:
+    """Key a render on the source file identity (path, mtime, size) and DPI."""
+
+    st = os.stat(pdf_path)
+    raw = f"{os.path.realpath(pdf_path)}:{st.st_mtime_ns}:{st.st_size}:{dpi}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load_cached_pages(manifest_path: Path, key: str) -> List[PageInfo] | None:
+    """Return pages from a matching manifest whose PNGs still exist, else None."""
+
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("key") != key:
+        return None
+    try:
+        pages = [PageInfo.model_validate(item) for item in manifest.get("pages", [])]
+    except (TypeError, ValidationError):
+        # Entries from an older PageInfo schema are a miss, not a rendering failure.
+        return None
+    if not all(page.source_path and os.path.isfile(page.source_path) for page in pages):
+        return None
+    return pages
+
 
 def render_pdf_to_images(
     pdf_path: Path,
@@ -25,6 +59,13 @@ def render_pdf_to_images(
     """
 
     out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / _RENDER_MANIFEST
+    cache_key = _render_cache_key(pdf_path, dpi)
+    cached = _load_cached_pages(manifest_path, cache_key)
+    if cached is not None:
+        print(f"Reusing rendered pages: {pdf_path} -> {out_dir} (dpi={dpi})")
+        return cached
+
     print(f"Rendering PDF: {pdf_path} -> {out_dir} (dpi={dpi})")
 
     with fitz.open(pdf_path) as doc:
@@ -59,4 +100,8 @@ def render_pdf_to_images(
                 )
             )
 
+    manifest_path.write_text(
+        json.dumps({"key": cache_key, "pages": [page.model_dump() for page in pages]}),
+        encoding="utf-8",
+    )
     return pages
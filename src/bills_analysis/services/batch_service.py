@@ -10,6 +10,8 @@ from bills_analysis.models.enums import BatchStatus, TaskType
 from bills_analysis.models.internal import BatchRecord, QueueTask
 from bills_analysis.services.ports import BatchRepository, TaskQueue
 
+_ROW_INDEX_CACHE_SIZE = 128
+
 
 class BatchService:
     """Application service orchestrating batch lifecycle transitions."""
@@ -19,6 +21,8 @@ class BatchService:
 
         self.repo = repo
         self.queue = queue
+        # batch_id -> (review_rows list the index was built from, row_id -> row).
+        self._row_indexes: dict[str, tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]] = {}
 
     async def create_batch(self, req: CreateBatchRequest) -> BatchRecord:
         """Persist a new batch and enqueue processing task."""
@@ -66,6 +70,14 @@ class BatchService:
             raise KeyError(batch_id)
         return batch, list(batch.review_rows)
 
+    async def get_review_row(self, batch_id: str, row_id: str) -> dict[str, Any] | None:
+        """Fetch one review row by its stable row id."""
+
+        batch = await self.repo.get(batch_id)
+        if batch is None:
+            raise KeyError(batch_id)
+        return self._review_row_index(batch).get(row_id)
+
     async def save_merge_source_local(self, batch_id: str, monthly_excel_path: str) -> BatchRecord:
         """Persist uploaded local monthly Excel source path for later merge."""
 
@@ -99,6 +111,23 @@ class BatchService:
         await self.queue.enqueue(task)
         return task
 
+    def _review_row_index(self, batch: BatchRecord) -> dict[str, dict[str, Any]]:
+        """Return a row_id index for the batch, rebuilt only when its review_rows list is replaced."""
+
+        rows = batch.review_rows
+        cached = self._row_indexes.get(batch.batch_id)
+        if cached is not None and cached[0] is rows:
+            return cached[1]
+        index: dict[str, dict[str, Any]] = {}
+        for idx, row in enumerate(rows, start=1):
+            # First row wins on duplicate ids, matching the previous linear scan.
+            index.setdefault(str(row.get("row_id") or f"row-{idx:04d}"), row)
+        self._row_indexes.pop(batch.batch_id, None)
+        self._row_indexes[batch.batch_id] = (rows, index)
+        if len(self._row_indexes) > _ROW_INDEX_CACHE_SIZE:
+            self._row_indexes.pop(next(iter(self._row_indexes)))
+        return index
+
     def _normalize_review_rows(self, rows: list[dict[str, Any]], *, run_date: str | None) -> list[dict[str, Any]]:
         """Validate and normalize submitted review rows into canonical backend shape."""
 
@@ -39,10 +39,11 @@ def run_pipeline(
     max_pages: int = 4,
     dpi: int = 300,
     purpose: str = "zbon",
+    use_cache: bool = False,
 ) -> Path:
-    """Run category-specific extraction pipeline and return the result JSON path."""
+    """Run category-specific extraction pipeline and return the result JSON Lines path."""
 
-    adapter = AzurePipelineAdapter()
+    adapter = AzurePipelineAdapter(use_cache=use_cache)
     return adapter.run_pipeline(
         pdf_paths,
         output_root=output_root,
@@ -65,8 +66,9 @@ def run_pipeline_by_category(
     backup_dest_dir: Path,
     run_date: str,
     results_dir: Path | None,
+    use_cache: bool = False,
 ) -> Path:
-    """Run BAR/ZBon or OFFICE modes and write a single merged results JSON file."""
+    """Run BAR/ZBon or OFFICE modes and write a single merged results JSON Lines file."""
 
     if not bar_pdfs and not zbon_pdfs and not office_pdfs:
         raise ValueError("必须提供 BAR/ZBon 或 OFFICE 的 PDF（或目录）。")
@@ -76,7 +78,7 @@ def run_pipeline_by_category(
     output_root = ROOT_DIR / "outputs" / "vlm_pipeline"
     timestamp = int(datetime.now().timestamp())
     final_results_dir = results_dir or output_root
-    results_path = final_results_dir / f"results_{timestamp}.json"
+    results_path = final_results_dir / f"results_{timestamp}.jsonl"
 
     if office_pdfs:
         run_pipeline(
@@ -88,6 +90,7 @@ def run_pipeline_by_category(
             results_dir=final_results_dir,
             results_path=results_path,
             dpi=300,
+            use_cache=use_cache,
         )
     else:
         run_pipeline(
@@ -99,6 +102,7 @@ def run_pipeline_by_category(
             results_dir=final_results_dir,
             results_path=results_path,
             dpi=300,
+            use_cache=use_cache,
         )
         run_pipeline(
             zbon_pdfs,
@@ -109,5 +113,6 @@ def run_pipeline_by_category(
             results_dir=final_results_dir,
             results_path=results_path,
             dpi=300,
+            use_cache=use_cache,
         )
     return results_path
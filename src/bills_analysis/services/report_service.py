@@ -111,7 +111,7 @@ def summarize_reliability(
 
 
 def resolve_results_path(json_path: Path | None, res_dir: Path | None) -> Path | None:
-    """Resolve explicit JSON path or latest timestamped JSON in a results directory."""
+    """Resolve explicit JSON path or latest timestamped JSON/JSONL in a results directory."""
 
     if json_path is not None:
         return json_path
@@ -121,7 +121,7 @@ def resolve_results_path(json_path: Path | None, res_dir: Path | None) -> Path |
         return None
     candidates: list[tuple[int, Path]] = []
     for path in res_dir.iterdir():
-        if not path.is_file() or path.suffix.lower() != ".json":
+        if not path.is_file() or path.suffix.lower() not in (".json", ".jsonl"):
             continue
         stem = path.stem
         _prefix, sep, ts = stem.rpartition("_")
@@ -12,22 +12,25 @@ from .contracts import BoundingBox, DocumentTokens, PageInfo, Token
 
 
 def _words_to_tokens(words, page_no: int) -> List[Token]:
+    # PyMuPDF word tuples are trusted input and page_no comes from enumerate(start=1), so build
+    # the models without per-token validation.
     tokens: List[Token] = []
     for word in words:
         # format: x0, y0, x1, y1, "text", block_no, line_no, word_no
         if len(word) < 5:
             continue
         x0, y0, x1, y1, text, *_ = word
+        x0, y0 = float(x0), float(y0)
         tokens.append(
-            Token(
+            Token.model_construct(
                 text=str(text),
                 confidence=1.0,
                 page_no=page_no,
-                bbox=BoundingBox(
-                    x=float(x0),
-                    y=float(y0),
-                    width=float(x1 - x0),
-                    height=float(y1 - y0),
+                bbox=BoundingBox.model_construct(
+                    x=x0,
+                    y=y0,
+                    width=float(x1) - x0,
+                    height=float(y1) - y0,
                 ),
             )
         )
@@ -42,7 +45,21 @@ def extract_text_layer_tokens(pdf_path: Path) -> DocumentTokens:
         for idx, page in enumerate(doc, start=1):
             words = page.get_text("words") or []
             all_tokens.extend(_words_to_tokens(words, page_no=idx))
-    return DocumentTokens(tokens=all_tokens)
+    return DocumentTokens.model_construct(tokens=all_tokens)
+
+
+def _token_area(tokens: DocumentTokens) -> float:
+    """Sum the bounding-box areas of all tokens."""
+
+    return sum(t.bbox.width * t.bbox.height for t in tokens.tokens)
+
+
+def _coverage(token_area: float, page_width: float, page_height: float) -> float:
+    """Return token area as a fraction of the page area, or 0.0 for a degenerate page."""
+
+    if page_width <= 0 or page_height <= 0:
+        return 0.0
+    return token_area / (page_width * page_height)
 
 
 def assess_token_coverage(tokens: DocumentTokens, page_width: float, page_height: float) -> float:
@@ -50,11 +67,9 @@ def assess_token_coverage(tokens: DocumentTokens, page_width: float, page_height
     Approximate how much area tokens cover on a page (used to catch bad OCR).
     """
 
-    if not tokens.tokens or page_width <= 0 or page_height <= 0:
+    if not tokens.tokens:
         return 0.0
-    total_area = page_width * page_height
-    token_area = sum(t.bbox.width * t.bbox.height for t in tokens.tokens)
-    return token_area / total_area
+    return _coverage(_token_area(tokens), page_width, page_height)
 
 
 def is_ocr_anomalous(
@@ -78,7 +93,9 @@ def is_ocr_anomalous(
         return True
 
     if pages:
-        per_page_cov = [assess_token_coverage(tokens, p.width, p.height) for p in pages]
+        # Token area does not depend on the page, so sum it once instead of once per page.
+        token_area = _token_area(tokens)
+        per_page_cov = [_coverage(token_area, p.width, p.height) for p in pages]
         avg_cov = sum(per_page_cov) / len(per_page_cov)
         if avg_cov < coverage_threshold:
             return True
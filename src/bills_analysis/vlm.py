@@ -5,13 +5,15 @@ from __future__ import annotations
 import base64
 import json
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
-
-import requests
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
 
 from .contracts import FieldCandidate, PageInfo
 
+if TYPE_CHECKING:
+    import requests
+
 
 fields_zbon = ["brutto", "netto", "store_name", "total_tax", "run_date"]
 fields_bar = ["brutto", "netto", "store_name", "total_tax", "run_date"]
@@ -54,6 +56,16 @@ prompts_dict = {
 
 DEFAULT_PROMPT = prompt_bar
 
+@lru_cache(maxsize=1)
+def _default_session() -> requests.Session:
+    """Process-wide keep-alive session so repeated VLM calls reuse one connection."""
+
+    # Imported on first call: the CLI only needs DEFAULT_PROMPT from this module at startup.
+    import requests
+
+    return requests.Session()
+
+
 def _encode_image(path: Path) -> str:
     return base64.b64encode(path.read_bytes()).decode("utf-8")
 
@@ -88,6 +100,7 @@ def infer_invoice_with_ollama(
     model: str = "qwen3-vl:4b",
     base_url: str = "http://localhost:11434",
     temperature: float = 0.0,
+    session: requests.Session | None = None,
 ) -> Tuple[List[FieldCandidate], Dict[str, str]]:
     """Send rendered page images to Ollama VLM and parse invoice fields."""
 
@@ -112,7 +125,8 @@ def infer_invoice_with_ollama(
 
     try:
         start = time.perf_counter()
-        resp = requests.post(f"{base_url}/api/chat", json=payload, timeout=120)
+        http = session if session is not None else _default_session()
+        resp = http.post(f"{base_url}/api/chat", json=payload, timeout=120)
         resp.raise_for_status()
         data = resp.json()
         content = data.get("message", {}).get("content") or ""
@@ -3,6 +3,11 @@ from __future__ import annotations
 import asyncio
 from datetime import UTC, datetime
 
+try:
+    import uvloop
+except ModuleNotFoundError:
+    uvloop = None  # type: ignore[assignment]
+
 from bills_analysis.models.enums import BatchStatus, TaskType
 from bills_analysis.services.ports import BatchRepository, ProcessingBackend, TaskQueue
 
@@ -79,4 +84,8 @@ async def run_worker(worker: BatchWorker) -> None:
 def run_worker_sync(worker: BatchWorker) -> None:
     """Sync entrypoint for local scripts/CLI."""
 
+    # Same loop the API gets from uvicorn's "auto" setting when uvicorn[standard] is installed.
+    if uvloop is not None:
+        uvloop.run(run_worker(worker))
+        return
     asyncio.run(run_worker(worker))
@@ -38,6 +38,12 @@ def main() -> None:
         default=datetime.now().strftime("%d/%m/%Y"),
         help="Run date in DD/MM/YYYY",
     )
+    parser.add_argument(
+        "--cache",
+        dest="use_cache",
+        action="store_true",
+        help="Reuse Azure results cached by PDF content (see BILLS_AZURE_CACHE)",
+    )
     args = parser.parse_args()
 
     bar_pdfs = collect_pdfs(args.bar, args.bar_dir)
@@ -51,6 +57,7 @@ def main() -> None:
         backup_dest_dir=args.backup_dest_dir,
         run_date=args.run_date,
         results_dir=args.results_dir,
+        use_cache=args.use_cache,
     )
     print(f"检测结果已保存: {results_path}")
 
@@ -244,6 +244,25 @@ def test_review_rows_and_preview_routes() -> None:
         assert preview_res.status_code == 200
         assert preview_res.headers["content-type"].startswith("application/pdf")
 
+        # Re-submitting review replaces the rows, so the old row id must stop resolving.
+        review_res = client.put(
+            f"/v1/batches/{batch_id}/review",
+            json={
+                "rows": [
+                    {
+                        "row_id": "row-0002",
+                        "filename": "a.pdf",
+                        "category": "bar",
+                        "result": {"brutto": "2.0"},
+                        "preview_path": str(preview_path.resolve()),
+                    }
+                ]
+            },
+        )
+        assert review_res.status_code == 200
+        assert client.get(body["rows"][0]["preview_url"]).status_code == 404
+        assert client.get(f"/v1/batches/{batch_id}/files/row-0002/preview").status_code == 200
+
 
 def test_submit_review_rejects_missing_result_shape() -> None:
     """Review submit should return 422 when row has neither result nor mappable fields."""
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from uuid import uuid4
+
+import fitz
+from typer.testing import CliRunner
+
+from bills_analysis import cli
+
+
+def test_batch_with_workers_runs_pool_path(monkeypatch) -> None:
+    """Batch with two workers should process every PDF through the process pool."""
+
+    root = Path("outputs") / "pytest_tmp" / str(uuid4())
+    root.mkdir(parents=True, exist_ok=True)
+    for name in ("a.pdf", "b.pdf"):
+        with fitz.open() as doc:
+            doc.new_page(width=200, height=200).insert_text((20, 40), name)
+            doc.save(root / name)
+
+    def fake_infer(pages, purpose, *, model, base_url, temperature, session=None):
+        """Stub the Ollama call with the real signature; forked workers inherit the patch."""
+
+        return [], {"vlm_model": model, "vlm_base_url": base_url, "vlm_error": ""}
+
+    monkeypatch.setattr(cli, "infer_invoice_with_ollama", fake_infer)
+    out = root / "runs"
+    result = CliRunner().invoke(
+        cli.app,
+        ["batch", str(root), "--out", str(out), "--workers", "2", "--dpi", "30", "--no-preprocess"],
+    )
+
+    assert result.exit_code == 0, result.output
+    for stem in ("a", "b"):
+        payload = json.loads((out / stem / "extraction.json").read_text(encoding="utf-8"))
+        assert payload["document_name"] == f"{stem}.pdf"
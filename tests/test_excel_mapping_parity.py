@@ -6,6 +6,7 @@ from uuid import uuid4
 
 from openpyxl import load_workbook
 
+from bills_analysis.excel_ops import build_rows_and_low_headers, build_rows_with_meta
 from bills_analysis.services.review_service import (
     export_daily_review_excel,
     export_office_review_excel,
@@ -56,6 +57,76 @@ def test_daily_excel_mapping_parity() -> None:
     assert float(row["Ausgabe 1 Brutto"]) == 20.0
 
 
+def test_fused_rows_and_low_headers_match_separate_builders() -> None:
+    """Fused single-pass builder should agree with the row wrapper and number highlights by column."""
+
+    items = [
+        {
+            "filename": "zbon.pdf",
+            "category": "zbon",
+            "result": {"run_date": "2026-02-04", "brutto": "100,00", "netto": None},
+            "score": {"brutto": 0.9},
+        },
+        {
+            "filename": "bar1.pdf",
+            "category": "bar",
+            "result": {"run_date": "04.02.2026", "store_name": "REWE", "brutto": "20.00", "netto": "16.00"},
+            "score": {"brutto": 0.9, "netto": 0.9},
+        },
+        {
+            "filename": "bar2.pdf",
+            "category": "bar",
+            "result": {"run_date": "04/02/2026", "store_name": "Lidl", "brutto": "5,00", "netto": "4,20"},
+            "score": {"brutto": 0.2, "netto": 0.9},
+        },
+    ]
+    thresholds = {"default": 0.8}
+
+    rows, zbon_files, low_headers = build_rows_and_low_headers(items, thresholds)
+
+    assert (rows, zbon_files) == build_rows_with_meta(items, thresholds)
+    assert low_headers["04/02/2026"] == {"Umsatz Netto", "Ausgabe 2 Brutto"}
+    assert rows[0]["need review"] is True
+    assert zbon_files["04/02/2026"] == ["bar1.pdf", "bar2.pdf"]
+
+
+def test_daily_excel_highlights_low_confidence_cells() -> None:
+    """Daily mapping should fill exactly the low-confidence cells of the day's row."""
+
+    root = Path("outputs") / "pytest_tmp" / str(uuid4())
+    json_path = root / "daily.json"
+    _write_json(
+        json_path,
+        [
+            {
+                "filename": "zbon.pdf",
+                "category": "zbon",
+                "result": {"run_date": "04/02/2026", "brutto": "100.00", "netto": None},
+                "score": {"brutto": 0.9},
+            },
+            {
+                "filename": "bar1.pdf",
+                "category": "bar",
+                "result": {"run_date": "04/02/2026", "store_name": "REWE", "brutto": "20.00", "netto": "16.00"},
+                "score": {"brutto": 0.9, "netto": 0.9},
+            },
+            {
+                "filename": "bar2.pdf",
+                "category": "bar",
+                "result": {"run_date": "04/02/2026", "store_name": "Lidl", "brutto": "5.00", "netto": "4.20"},
+                "score": {"brutto": 0.2, "netto": 0.9},
+            },
+        ],
+    )
+
+    out_path = export_daily_review_excel(json_path, config_path=Path("tests/config.json"))
+    ws = load_workbook(out_path).active
+    headers = [cell.value for cell in ws[1]]
+    filled = {headers[cell.column - 1] for cell in ws[2] if cell.fill.fill_type == "solid"}
+
+    assert filled == {"Umsatz Netto", "Ausgabe 2 Brutto", "need review"}
+
+
 def test_office_excel_mapping_parity() -> None:
     """Office mapping should keep review columns and need-review marking behavior."""
 
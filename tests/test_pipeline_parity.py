@@ -41,9 +41,9 @@ def test_compressed_pdf_name_parity() -> None:
 
 
 def test_pipeline_adapter_result_append_parity(monkeypatch) -> None:
-    """Pipeline adapter should append one JSON entry per processed input file."""
+    """Pipeline adapter should append one JSON line per processed input file."""
 
-    adapter = AzurePipelineAdapter(max_workers=1)
+    adapter = AzurePipelineAdapter(max_workers=1, warmup=False)
     test_root = Path("outputs") / "pytest_tmp" / str(uuid4())
     output_root = test_root / "vlm_pipeline"
     backup_root = test_root / "archive"
@@ -70,8 +70,45 @@ def test_pipeline_adapter_result_append_parity(monkeypatch) -> None:
         run_date="04/02/2026",
     )
 
-    data = json.loads(results_path.read_text(encoding="utf-8"))
-    assert isinstance(data, list)
+    assert results_path.suffix == ".jsonl"
+    lines = results_path.read_text(encoding="utf-8").splitlines()
+    data = [json.loads(line) for line in lines]
     assert len(data) == 2
     assert data[0]["filename"] == "file_1.pdf"
     assert data[1]["filename"] == "file_2.pdf"
+
+
+def test_pipeline_adapter_reuses_cached_azure_result(monkeypatch) -> None:
+    """A second analysis of identical PDF bytes should be served from the disk cache."""
+
+    import bills_analysis.extract_by_azure_api as azure_api
+
+    test_root = Path("outputs") / "pytest_tmp" / str(uuid4())
+    monkeypatch.setenv("BILLS_AZURE_CACHE", str(test_root / "cache"))
+    calls: list[str] = []
+
+    def fake_analyze(
+        path, model_id="prebuilt-invoice", *, return_fields=False, file_content=None, max_workers=None
+    ):
+        """Stub Azure DI call that records invocations."""
+
+        calls.append(model_id)
+        if not return_fields:
+            return {"brutto": 1.5}
+        return {"brutto": 1.5}, {"Total": {"content": "1,50", "polygon": [1, 2]}}
+
+    monkeypatch.setattr(azure_api, "analyze_document_with_azure", fake_analyze)
+    adapter = AzurePipelineAdapter(max_workers=1, warmup=False, use_cache=True)
+    pdf_path = Path("a.pdf")
+    pdf_bytes = b"%PDF-1.7 same"
+
+    first = adapter._analyze_with_cache(pdf_path, "prebuilt-receipt", pdf_bytes)
+    second = adapter._analyze_with_cache(pdf_path, "prebuilt-receipt", pdf_bytes)
+    assert calls == ["prebuilt-receipt"]
+    assert first == second == ({"brutto": 1.5}, {})
+
+    # An entry stored without fields cannot serve an OFFICE run, which needs them.
+    third = adapter._analyze_with_cache(pdf_path, "prebuilt-receipt", pdf_bytes, need_fields=True)
+    fourth = adapter._analyze_with_cache(pdf_path, "prebuilt-receipt", pdf_bytes, need_fields=True)
+    assert calls == ["prebuilt-receipt", "prebuilt-receipt"]
+    assert third == fourth == ({"brutto": 1.5}, {"Total": {"content": "1,50"}})
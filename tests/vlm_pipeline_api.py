@@ -20,6 +20,7 @@ def run_pipeline(
     max_pages: int = 4,
     dpi: int = 300,
     purpose: str = "zbon",
+    use_cache: bool = False,
 ) -> None:
     """Compatibility wrapper that delegates pipeline execution to src service."""
 
@@ -34,6 +35,7 @@ def run_pipeline(
         max_pages=max_pages,
         dpi=dpi,
         purpose=purpose,
+        use_cache=use_cache,
     )
 
 
@@ -76,6 +78,12 @@ def main() -> None:
         default=datetime.now().strftime("%d/%m/%Y"),
         help="Run date in DD/MM/YYYY",
     )
+    parser.add_argument(
+        "--cache",
+        dest="use_cache",
+        action="store_true",
+        help="Reuse Azure results cached by PDF content (see BILLS_AZURE_CACHE)",
+    )
     args = parser.parse_args()
 
     inputs = list(args.inputs)
@@ -119,6 +127,7 @@ def main() -> None:
         results_dir=args.results_dir,
         max_pages=max_pages,
         dpi=300,
+        use_cache=args.use_cache,
     )
 
 